@@ -0,0 +1,205 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # headless, no window is opened
+
+from CoordinateSystem import CoordinateSystem, ErrorCollector, Function, Sequence, Vector
+import numpy as np
+import argparse
+import platform
+import tracemalloc
+import pygame
+import json
+import math
+import time
+
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+SEQUENCE_MAX_TERMS = 20000  # the terms of a recursive sequence are big, the sequence workload is capped
+VECTORS_MAX_NUMBER = 2000  # one graph element per vector
+FRAMES = 20
+
+
+def polynomial(x):
+    return x ** 2 + 3 * x - 5
+
+
+def make_function_workload(expression, vectorized: bool, x_min: float, x_max: float, points: int):
+    def make():
+        element = Function(expression, trace_step=(x_max - x_min) / points, vectorized=vectorized)
+        system = CoordinateSystem(graph_elements=[element], screen_size=(500, 500),
+                                  x_min=x_min, x_max=x_max, x_graduation_step=1,
+                                  y_min=-10, y_max=10, y_graduation_step=1)
+
+        return system, lambda: element.get_images(x_min, x_max, element.trace_step, ErrorCollector()), points
+
+    return make
+
+
+def make_sequence_workload(points: int):
+    terms = min(points, SEQUENCE_MAX_TERMS)
+
+    def make():
+        def recursive_sequence(n):
+            if n == 0:
+                return 1
+
+            return element.get_memoized_term(n - 1) * 0.5 + math.sin(n)
+
+        element = Sequence(recursive_sequence, n_min=0, memoize=True, draw_lines_between_points=True)
+        system = CoordinateSystem(graph_elements=[element], screen_size=(500, 500),
+                                  x_min=-10, x_max=terms, x_graduation_step=terms / 10,
+                                  y_min=-3, y_max=3, y_graduation_step=1)
+
+        return system, lambda: element.get_terms(0, terms, 1, ErrorCollector()), terms
+
+    return make
+
+
+def make_vectors_workload(points: int):
+    number = min(points // 2, VECTORS_MAX_NUMBER)
+
+    def make():
+        angles = np.linspace(0, 2 * math.pi, number, endpoint=False)
+        elements = [Vector(coordinate=(8 * math.cos(angle), 8 * math.sin(angle))) for angle in angles]
+        system = CoordinateSystem(graph_elements=elements, screen_size=(500, 500),
+                                  x_min=-10, x_max=10, x_graduation_step=1,
+                                  y_min=-10, y_max=10, y_graduation_step=1)
+
+        return system, lambda: [element.get_points() for element in elements], number * 2
+
+    return make
+
+
+def get_workloads(points: int) -> dict:
+    return {"polynomial": make_function_workload(polynomial, False, -10, 10, points),
+            "polynomial (vectorized)": make_function_workload(polynomial, True, -10, 10, points),
+            "tan": make_function_workload(math.tan, False, -10, 10, points),
+            "tan (vectorized)": make_function_workload(np.tan, True, -10, 10, points),
+            "exp overflow": make_function_workload(math.exp, False, -10, 1000, points),
+            "exp overflow (vectorized)": make_function_workload(np.exp, True, -10, 1000, points),
+            "recursive sequence": make_sequence_workload(points),
+            "vectors": make_vectors_workload(points)}
+
+
+def percentile(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_workload(name: str, make, points: int, measure_memory: bool) -> dict:
+    # evaluation alone, then the sampling pipeline (cold cache), then the frames (drawing of the plot layer)
+    system, evaluate, evaluations = make()
+    start = time.perf_counter()
+    evaluate()
+    evaluation_time = time.perf_counter() - start
+
+    system, evaluate, evaluations = make()
+    system.set_axes_info()
+
+    start = time.perf_counter()
+    system.get_graduations(True, True)
+    graduations_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    system.get_points()
+    sampling_time = time.perf_counter() - start
+
+    colors = [(0, 0, 0)] * len(system.graph_elements)
+    frame_times, curves_times, graduation_drawing_times = [], [], []
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        system.draw_plot_layer((255, 255, 255), colors, (0, 0, 0), (0, 0, 0), True, True)
+        frame_times.append(time.perf_counter() - start)
+
+        system.screen = system.plot_layer
+        start = time.perf_counter()
+        system.draw_graduations(system.x_grad, system.y_grad, (0, 0, 0))
+        graduation_drawing_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for element, curve_points in system.curves_points:
+            system.draw_curve(curve_points, (0, 0, 0), element)
+        curves_times.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if measure_memory:
+        system, evaluate, evaluations = make()
+        system.set_axes_info()
+
+        tracemalloc.start()
+        system.get_points()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    system.shutdown_executors()
+
+    return {"workload": name, "points": points, "evaluations": evaluations,
+            "evaluation_time": evaluation_time,
+            "evaluations_per_second": evaluations / evaluation_time if evaluation_time > 0 else math.inf,
+            "sampling_time": sampling_time, "graduations_time": graduations_time,
+            "frame_time_p50": percentile(frame_times, 50), "frame_time_p90": percentile(frame_times, 90),
+            "frame_time_p99": percentile(frame_times, 99),
+            "draw_curve_p50": percentile(curves_times, 50),
+            "draw_graduations_p50": percentile(graduation_drawing_times, 50),
+            "peak_memory": peak_memory}
+
+
+def print_result(result: dict) -> None:
+    memory = f"{result['peak_memory'] / 1024 ** 2:8.1f} MB" if result["peak_memory"] is not None else "       -"
+    print(f"{result['workload']:<27} {result['points']:>9} pts | "
+          f"{result['evaluations_per_second']:>12,.0f} eval/s | sampling {result['sampling_time'] * 1000:9.1f} ms | "
+          f"frame p50 {result['frame_time_p50'] * 1000:7.2f} ms p90 {result['frame_time_p90'] * 1000:7.2f} ms "
+          f"p99 {result['frame_time_p99'] * 1000:7.2f} ms | peak {memory}")
+
+
+def compare(results: list, previous_filename: str) -> None:
+    # ratio > 1 : slower than the previous run
+    with open(previous_filename) as file:
+        previous = {(result["workload"], result["points"]): result for result in json.load(file)["results"]}
+
+    print(f"\ncomparison with {previous_filename} (current / previous, > 1 is slower) :")
+    for result in results:
+        old = previous.get((result["workload"], result["points"]))
+        if old is None:
+            continue
+
+        ratios = []
+        for key in ("evaluation_time", "sampling_time", "frame_time_p50"):
+            ratios.append(f"{key} x{result[key] / old[key]:.2f}" if old[key] else f"{key} -")
+
+        print(f"{result['workload']:<27} {result['points']:>9} pts | " + " | ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of the sampling, projection and rendering of "
+                                                 "CoordinateSystem (headless)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="numbers of points of the workloads (up to 10 000 000)")
+    parser.add_argument("--workloads", nargs="+", default=None, help="names of the workloads to run (all by default)")
+    parser.add_argument("--output", default="benchmark.json", help="json file where the results are saved")
+    parser.add_argument("--compare", default=None, help="json file of a previous run to compare with")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure the peak memory (faster)")
+    args = parser.parse_args()
+
+    pygame.font.init()
+
+    results = []
+    for points in args.sizes:
+        for name, make in get_workloads(points).items():
+            if args.workloads is not None and name not in args.workloads:
+                continue
+
+            result = run_workload(name, make, points, not args.no_memory)
+            print_result(result)
+            results.append(result)
+
+    with open(args.output, "w") as file:
+        json.dump({"date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                   "pygame": pygame.version.ver, "numpy": np.__version__, "results": results}, file, indent=4)
+
+    print(f"\nresults saved in {args.output}")
+
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,60 +1,373 @@
 from tkinter import Tk, messagebox
 import pygame
+import os
+import numpy as np
 import math
+import pickle
+import threading
+import copy
+import itertools
+import time
+from collections import OrderedDict, deque
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+ADAPTIVE_MAX_DEPTH = 12  # a segment is halved at most 12 times (1/4096 pixel)
+
+TILE_SIZE = 1024  # samples per tile of the SampleCache
+
+MOVEMENTS_PER_SECOND = 20  # x_step_movement and y_step_movement are travelled 20 times per second
+MAX_FRAME_DURATION = 0.1  # seconds, longer frames (after waiting for an event) don't make the view jump
+
+IDLE_WAIT_TIMEOUT = 250  # milliseconds
+SAMPLING_STOP_TIMEOUT = 0.2  # seconds waited for the sampling worker when the window is closed
+POINTS_PUBLISHED_EVENT = pygame.USEREVENT + 1
+
+CULLING_MARGIN = 8  # pixels around the screen where the points are still drawn
+CLAMP_FACTOR = 16  # the kept off-screen points are clamped to 16 times the screen size
+DECIMATION_THRESHOLD = 4  # the curves with more points than 4 per pixel column are decimated
+
+PROFILER_HISTORY = 120  # frames averaged by the Profiler
+
+PROGRESSIVE_COARSE_SPACING = 8  # pixels between two samples of the first pass of the progressive sampling
+PROGRESSIVE_FIRST_CHUNK_SIZE = 16  # samples of the first chunk of a function, measures its cost per sample
+PROGRESSIVE_MIN_CHUNK_SIZE = 16  # the next chunks fill what is left of the frame budget, at least 16 samples
+
+LABELS_CACHE_SIZE = 512  # rendered texts kept by get_label
+
+GRADUATION_SPACING = 50  # pixels, minimum space between two graduations with graduation_step="auto"
+
+DEFAULT_HEATMAP_COLORS = [(0, 0, 255), (0, 255, 255), (0, 255, 0), (255, 255, 0), (255, 0, 0)]  # low to high
+
+DEFAULT_POINTS_COLORS = [(0, 0, 0), (0, 0, 255), (255, 0, 0),
+                         (0, 255, 0), (255, 192, 203), (255, 165, 0),
+                         (139, 69, 19), (0, 255, 255)
+                         ]
+
+# shared between the systems (and between the jobs of render_many in one process)
+fonts = {}  # size -> pygame.font.Font
+render_surfaces = {}  # size -> pygame.Surface
+labels = OrderedDict()  # (text, color, size) -> rendered text, least recently used first
+
+
+def get_font(size: int) -> pygame.font.Font:
+    font = fonts.get(size)
+    if font is None:
+        font = fonts[size] = pygame.font.Font(None, size)
+
+    return font
+
+
+def get_label(text: str, color: tuple, size: int) -> pygame.Surface:
+    # the texts (graduations, mouse coordinate) are only rendered when they change
+    key = (text, tuple(color), size)
+    label = labels.get(key)
+    if label is None:
+        label = labels[key] = get_font(size).render(text, True, color)
+        if len(labels) > LABELS_CACHE_SIZE:
+            labels.popitem(last=False)
+    else:
+        labels.move_to_end(key)
+
+    return label
+
+
+def quit_pygame() -> None:
+    # the fonts (and the texts they rendered) don't survive pygame.quit, the next init builds them again
+    fonts.clear()
+    labels.clear()
+    pygame.quit()
+
+
+def get_render_surface(size: tuple) -> pygame.Surface:
+    size = (int(size[0]), int(size[1]))
+    surface = render_surfaces.get(size)
+    if surface is None:
+        surface = render_surfaces[size] = pygame.Surface(size)
+
+    return surface
+
+EVALUATION_CHUNK_SIZE = 2048  # minimum number of samples sent to a worker, a cancelled sampling stops between chunks
+
+
+def get_grid_indices(start: float, stop: float, step: float, outer: bool = False) -> np.ndarray:
+    # indices i of the multiples i * step between start and stop (the bounds are included despite rounding errors),
+    # with outer the multiples just before start and just after stop are added so a curve reaches the edges of the view
+    if step <= 0:
+        raise ValueError("step must be > 0")
+
+    if outer:
+        return np.arange(math.floor(start / step + 1e-9), math.ceil(stop / step - 1e-9) + 1)
+
+    return np.arange(math.ceil(start / step - 1e-9), math.floor(stop / step + 1e-9) + 1)
+
+
+def get_exception_message(error_type: type, args: tuple) -> str:
+    # str of the exception, built again from its class and its args
+    try:
+        return str(error_type(*args))
+
+    except Exception:
+        return ", ".join(str(arg) for arg in args)
+
+
+class ErrorCollector:
+    # the errors ignored while calculating the points, by (element name, exception type, message) :
+    # number of occurrences and range of the x (or n) where they happened.
+    # The sampling threads add errors while the main loop reads them, the entries are changed under the lock
+    def __init__(self):
+        # (element name, exception type, message) -> [count, x min, x max], the exceptions are stored as
+        # (element name, exception class, args) and only formatted by get_errors
+        self.errors = {}
+        self.recalculated = {}  # element calculated again at each redraw -> ErrorCollector of its last calculation
+        self.lock = threading.Lock()
+
+    def add(self, element_name: str, error_type: str, message: str, x: float) -> None:
+        self.add_entry((element_name, error_type, message), x)
+
+    def add_exception(self, element_name: str, error: Exception, x: float) -> None:
+        # str(error) is not calculated for each failing sample
+        key = (element_name, type(error), error.args)
+        try:
+            hash(key)
+
+        except TypeError:  # unhashable args
+            key = (element_name, type(error).__name__, str(error))
+
+        self.add_entry(key, x)
+
+    def add_entry(self, key: tuple, x: float) -> None:
+        with self.lock:
+            entry = self.errors.get(key)
+            if entry is None:
+                self.errors[key] = [1, x, x]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], x)
+                entry[2] = max(entry[2], x)
+
+    def add_many(self, element_name: str, error_type: str, message: str, xs: np.ndarray) -> None:
+        if len(xs) == 0:
+            return
+
+        self.merge_entry((element_name, error_type, message), [len(xs), float(xs.min()), float(xs.max())])
+
+    def merge_entry(self, key: tuple, new_entry: list) -> None:
+        with self.lock:
+            entry = self.errors.get(key)
+            if entry is None:
+                self.errors[key] = list(new_entry)
+            else:
+                entry[0] += new_entry[0]
+                entry[1] = min(entry[1], new_entry[1])
+                entry[2] = max(entry[2], new_entry[2])
+
+    def merge(self, other) -> None:
+        with other.lock:
+            entries = list(other.errors.items())
+            recalculated = dict(other.recalculated)
+
+        for key, entry in entries:
+            self.merge_entry(key, entry)
+
+        with self.lock:
+            self.recalculated.update(recalculated)
+
+    def replace(self, element, other) -> None:
+        # the errors of an element calculated again (not cached) replace its previous ones instead of adding up
+        with self.lock:
+            self.recalculated[element] = other
+
+    def get_errors(self) -> dict:
+        # (element name, exception type name, message) -> [count, x min, x max], with the recalculated elements
+        with self.lock:
+            entries = list(self.errors.items())
+            others = list(self.recalculated.values())
+
+        for other in others:
+            with other.lock:
+                entries += list(other.errors.items())
+
+        errors = {}
+        for (element_name, error_type, message), (count, x_min, x_max) in entries:
+            if isinstance(error_type, type):
+                error_type, message = error_type.__name__, get_exception_message(error_type, message)
+
+            entry = errors.get((element_name, error_type, message))
+            if entry is None:
+                errors[(element_name, error_type, message)] = [count, x_min, x_max]
+            else:
+                errors[(element_name, error_type, message)] = [entry[0] + count, min(entry[1], x_min),
+                                                               max(entry[2], x_max)]
+
+        return errors
+
+    def get_report(self) -> str:
+        # - element log :
+        #   - math domain error (ValueError) ×50,000 on [-10, 0]
+        by_element = {}
+        for (element_name, error_type, message), (count, x_min, x_max) in self.get_errors().items():
+            by_element.setdefault(element_name, []).append(
+                f"  - {message} ({error_type}) ×{count:,} on [{x_min:g}, {x_max:g}]\n")
+
+        return "".join(f"- element {element_name} : \n" + "".join(lines) for element_name, lines in by_element.items())
+
+    def clear(self) -> None:
+        with self.lock:
+            self.errors = {}
+            self.recalculated = {}
+
+    def __len__(self) -> int:
+        return len(self.get_errors())
+
+    def __getstate__(self) -> dict:
+        # the collectors of the process workers are sent back to be merged, the lock can't be sent
+        with self.lock:
+            state = {"errors": dict(self.errors), "recalculated": dict(self.recalculated)}
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
 
 
 class Function:
     def __init__(self, expression, trace_step: float = 0.1, draw_points: bool = False,
-                 draw_lines_between_points: bool = True):
+                 draw_lines_between_points: bool = True, vectorized: bool = False, adaptive: bool = False,
+                 adaptive_tolerance: float = 0.5, animated: bool = False):
+        # animated : expression(x, t) where t is the time of the animation (s)
         self.expression = expression
         self.expression_name = expression.__name__
         self.trace_step = trace_step
         self.draw_points = draw_points
         self.draw_lines_between_points = draw_lines_between_points
+        self.vectorized = vectorized
+        self.adaptive = adaptive
+        self.adaptive_tolerance = adaptive_tolerance
+        self.animated = animated
+        self.time = 0.0
 
         if trace_step < 0:
             raise ValueError("trace_step must be >= 0")
 
+        if trace_step == 0 and not adaptive:
+            raise ValueError("trace_step must be > 0 (it can only be 0 with adaptive=True, where it is ignored)")
+
         if type(draw_points) is not bool:
             raise TypeError(f"draw_points must be True or False not {type(draw_points)}")
 
         if type(draw_lines_between_points) is not bool:
             raise TypeError(f"draw_lines_between_points must be True or False not {type(draw_lines_between_points)}")
 
-    def get_images(self, start: int, stop: int, step: float, errors_dict: dict = None) -> dict[int: float]:
-        images = {}
-        x = start
-        errors_dict.setdefault(self.expression_name, [])
-        while x <= stop:
-            try:
-                image = self.expression(x)
-                if image is None:
-                    raise ValueError("Result Is None")
+        if type(vectorized) is not bool:
+            raise TypeError(f"vectorized must be True or False not {type(vectorized)}")
 
-                if isinstance(image, complex):
-                    raise ValueError("Result Is Complex Number")
+        if type(adaptive) is not bool:
+            raise TypeError(f"adaptive must be True or False not {type(adaptive)}")
 
-                images[x] = image
+        if adaptive_tolerance <= 0:
+            raise ValueError("adaptive_tolerance must be > 0")
 
-            except (ZeroDivisionError, ValueError, OverflowError, TypeError) as e:
-                if isinstance(errors_dict, dict) and not any(str(e) in values for values in errors_dict.values()):
-                    errors_dict[f"{self.expression_name}"].append(str(e))
+        if type(animated) is not bool:
+            raise TypeError(f"animated must be True or False not {type(animated)}")
 
-            x += step
+        if animated and adaptive:
+            raise ValueError("an animated function can't be adaptive")
 
-        return images
+    def evaluate(self, x):
+        return self.expression(x, self.time) if self.animated else self.expression(x)
+
+    def get_vectorized_images(self, xs: np.ndarray, errors: ErrorCollector = None) -> np.ndarray | None:
+        # evaluate all the xs in one call (nan where there is no image), None if the expression does not accept a numpy array
+        try:
+            with np.errstate(all="ignore"):
+                images = np.asarray(self.evaluate(xs))
+                images = np.broadcast_to(images, xs.shape)
+
+        except (ZeroDivisionError, ValueError, OverflowError, TypeError):
+            return None
 
+        if images.dtype.kind not in "biufc":
+            return None
+
+        complex_mask = np.zeros(xs.shape, dtype=bool)
+        if images.dtype.kind == "c":
+            complex_mask = images.imag != 0
+            images = np.where(complex_mask, np.nan, images.real)
+
+        images = images.astype(float)
+
+        if errors is not None:
+            errors.add_many(self.expression_name, "ValueError", "Result Is Complex Number", xs[complex_mask])
+            errors.add_many(self.expression_name, "ValueError", "Result Is NaN (domain error)",
+                            xs[np.isnan(images) & ~complex_mask])
+            errors.add_many(self.expression_name, "OverflowError", "Result Is Infinite (overflow or division by zero)",
+                            xs[np.isinf(images)])
+
+        return np.where(np.isfinite(images), images, np.nan)
+
+    def get_image(self, x: float, errors: ErrorCollector = None) -> float:
+        try:
+            image = self.evaluate(x)
+            if image is None:
+                raise ValueError("Result Is None")
+
+            if isinstance(image, complex):
+                raise ValueError("Result Is Complex Number")
+
+            return float(image)
+
+        except (ZeroDivisionError, ValueError, OverflowError, TypeError) as e:
+            if errors is not None:
+                errors.add_exception(self.expression_name, e, x)
+
+        return math.nan
+
+    def get_images_at(self, xs: np.ndarray, errors: ErrorCollector = None) -> np.ndarray:
+        # images of xs, nan where there is no image
+        xs = np.asarray(xs, dtype=float)
+
+        if self.vectorized:
+            images = self.get_vectorized_images(xs, errors)
+            if images is not None:
+                return images
+
+        return np.fromiter((self.get_image(x, errors) for x in xs.tolist()), dtype=float, count=len(xs))
+
+    def get_images(self, start: int, stop: int, step: float,
+                   errors: ErrorCollector = None) -> tuple[np.ndarray, np.ndarray]:
+        # the xs are the multiples of step between start and stop (i * step, no accumulated float error),
+        # so a x is sampled at exactly the same value whatever the view is
+        xs = get_grid_indices(start, stop, step) * step
+
+        return xs, self.get_images_at(xs, errors)
 
     def __repr__(self):
         return f"Function(expression_name={self.expression_name})"
 
 
 class Sequence:
-    def __init__(self, formula, n_min: int = 0, trace_step: int = 1, draw_points: bool = True,
-                 draw_lines_between_points: bool = False):
+    def __init__(self, formula=None, n_min: int = 0, trace_step: int = 1, draw_points: bool = True,
+                 draw_lines_between_points: bool = False, memoize: bool = False, memo_size: int = 100000,
+                 initial_terms: list = None, recurrence=None):
+        # formula(n) -> term, or initial_terms (terms from n_min) and recurrence(n, previous_terms) -> term
+        # where previous_terms are the len(initial_terms) terms before n
+
+        if formula is None and (recurrence is None or not initial_terms):
+            raise ValueError("Sequence needs a formula or initial_terms and a recurrence")
 
         self.formula = formula
-        self.formula_name = formula.__name__
+        self.formula_name = formula.__name__ if formula is not None else recurrence.__name__
+
+        self.memoize = memoize
+        self.memo_size = memo_size
+        self.memo = OrderedDict()  # n -> term, kept between the redraws
+
+        self.recurrence = recurrence if formula is None else None
+        self.terms_buffer = list(initial_terms) if self.recurrence is not None else []  # terms from n_min
+        self.order = len(self.terms_buffer)
 
         self.trace_step = trace_step
         self.draw_points = draw_points
@@ -75,36 +388,107 @@ class Sequence:
         if type(draw_lines_between_points) is not bool:
             raise TypeError(f"draw_lines_between_points must be True or False not {type(draw_lines_between_points)}")
 
-    def get_terms(self, start: int, stop: int, step: int, errors_dict: dict = None) -> dict[int: float]:
-        terms = {}
+        if type(memoize) is not bool:
+            raise TypeError(f"memoize must be True or False not {type(memoize)}")
+
+        if memo_size <= 0:
+            raise ValueError("memo_size must be > 0")
+
+    def get_memoized_term(self, n: int):
+        # a recursive formula calls this method (not itself) for its recursive calls to use the memo :
+        # the memo of a formula calling itself only holds the terms asked by the system
+        if n in self.memo:
+            self.memo.move_to_end(n)
+            return self.memo[n]
+
+        term = self.formula(n)
+
+        self.memo[n] = term
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+
+        return term
+
+    def extend_terms(self, n_max: int, errors: ErrorCollector = None, is_cancelled=None) -> None:
+        # the recurrence is calculated once, in order, the buffer only grows when a bigger n is needed
+        n = self.n_min + len(self.terms_buffer)
+        while n <= n_max:
+            if is_cancelled is not None and is_cancelled():
+                raise SamplingCancelled
+
+            try:
+                term = self.recurrence(n, self.terms_buffer[-self.order:])
+                if isinstance(term, complex):
+                    raise ValueError("Result Is Complex Number")
+
+                if term is None:
+                    raise ValueError("Result Is None")
+
+            except (ZeroDivisionError, ValueError, OverflowError) as e:
+                # the next terms depend on this one, the sequence stops here
+                if errors is not None:
+                    errors.add_exception(self.formula_name, e, n)
+                return
+
+            self.terms_buffer.append(term)
+            n += 1
+
+    def get_float_term(self, n: int, term, errors: ErrorCollector = None) -> float:
+        try:
+            return float(term)
+
+        except OverflowError as e:
+            if errors is not None:
+                errors.add_exception(self.formula_name, e, n)
+
+            return math.nan
+
+    def get_terms(self, start: int, stop: int, step: int, errors: ErrorCollector = None,
+                  is_cancelled=None) -> tuple[np.ndarray, np.ndarray]:
+        # n and terms (nan where there is no term), is_cancelled() is checked before each term
         param_for_loop = []
-        errors_dict.setdefault(self.formula_name, [])
 
         for i in {start: "start", stop: "stop", step: "step"}.items():
             if type(i[0]) is int:
                 param_for_loop.append(i[0])
             else:
-                if type(errors_dict) is dict:
-                    errors_dict[f"{self.formula_name}"].append(f"{i[1]} transformed in int ({i[0]} to {int(i[0])})")
+                if errors is not None:
+                    errors.add(self.formula_name, "TypeError", f"{i[1]} transformed in int", i[0])
 
                 param_for_loop.append(int(i[0]))
 
-        for x in range(*param_for_loop):
+        if self.recurrence is not None:
+            self.extend_terms(param_for_loop[1] - 1, errors, is_cancelled)
+
+            ns = [n for n in range(*param_for_loop) if 0 <= n - self.n_min < len(self.terms_buffer)]
+            terms = np.fromiter((self.get_float_term(n, self.terms_buffer[n - self.n_min], errors) for n in ns),
+                                dtype=float, count=len(ns))
+
+            return np.array(ns, dtype=float), terms
+
+        ns = range(*param_for_loop)
+        terms = array("d")
+        for x in ns:
+            if is_cancelled is not None and is_cancelled():
+                raise SamplingCancelled
+
             try:
-                term = self.formula(x)
+                term = self.get_memoized_term(x) if self.memoize else self.formula(x)
                 if isinstance(term, complex):
                     raise ValueError("Result Is Complex Number")
 
                 if term is None:
                     raise ValueError("Result Is None")
 
-                terms[x] = term
+                terms.append(float(term))
 
             except (ZeroDivisionError, ValueError, OverflowError) as e:
-                if type(errors_dict) is dict and not any(str(e) in values for values in errors_dict.values()):
-                    errors_dict[f"{self.formula_name}"].append(str(e))
+                if errors is not None:
+                    errors.add_exception(self.formula_name, e, x)
 
-        return terms
+                terms.append(math.nan)
+
+        return np.array(ns, dtype=float), np.array(terms)
 
 
     def __repr__(self):
@@ -131,11 +515,11 @@ class Vector:
         self.start_coordinate = start_coordinate
         self.end_coordinate = coordinate
 
-    def get_points(self):
-        points = {self.start_coordinate[0]: self.start_coordinate[1],
-                  self.start_coordinate[0] + self.x: self.start_coordinate[1] + self.y}
+    def get_points(self) -> tuple[np.ndarray, np.ndarray]:
+        xs = np.array([self.start_coordinate[0], self.start_coordinate[0] + self.x], dtype=float)
+        ys = np.array([self.start_coordinate[1], self.start_coordinate[1] + self.y], dtype=float)
 
-        return points
+        return xs, ys
 
     def operation(self, sign: str, other):
         if isinstance(other, Vector):
@@ -181,6 +565,359 @@ class Vector:
         return f"Vector(x={self.x} ; y={self.y}) starting at (x={self.start_coordinate[0]} ; y={self.start_coordinate[1]})"
 
 
+class ImplicitCurve:
+    def __init__(self, expression, resolution: int = 4, draw_points: bool = False,
+                 draw_lines_between_points: bool = True):
+        # the curve expression(x, y) = 0, calculated on a grid of about one sample every resolution pixels
+        self.expression = expression
+        self.expression_name = expression.__name__
+        self.resolution = resolution
+        self.draw_points = draw_points
+        self.draw_lines_between_points = draw_lines_between_points
+
+        if type(resolution) is not int or resolution <= 0:
+            raise ValueError("resolution must be an int > 0")
+
+        if type(draw_points) is not bool:
+            raise TypeError(f"draw_points must be True or False not {type(draw_points)}")
+
+        if type(draw_lines_between_points) is not bool:
+            raise TypeError(f"draw_lines_between_points must be True or False not {type(draw_lines_between_points)}")
+
+    def __repr__(self):
+        return f"ImplicitCurve(expression_name={self.expression_name})"
+
+
+class Heatmap:
+    def __init__(self, expression, resolution: int = 2, colors: list = None, value_min: float = None,
+                 value_max: float = None, alpha: int = 192):
+        # the values of expression(x, y) as colors, from colors[0] (value_min) to colors[-1] (value_max),
+        # the limits are the smallest and the biggest visible values when they are None
+        self.expression = expression
+        self.expression_name = expression.__name__
+        self.resolution = resolution
+        self.colors = np.array(colors if colors is not None else DEFAULT_HEATMAP_COLORS, dtype=float)
+        self.value_min = value_min
+        self.value_max = value_max
+        self.alpha = alpha
+
+        if type(resolution) is not int or resolution <= 0:
+            raise ValueError("resolution must be an int > 0")
+
+        if self.colors.ndim != 2 or self.colors.shape[1] != 3 or len(self.colors) < 2:
+            raise ValueError("colors must be a list of at least 2 RGB tuples")
+
+        if value_min is not None and value_max is not None and value_min >= value_max:
+            raise ValueError(f"value_min ({value_min}) must be less than value_max ({value_max})")
+
+        if not 0 <= alpha <= 255:
+            raise ValueError("alpha must be between 0 and 255")
+
+    def get_surface(self, values: np.ndarray) -> pygame.Surface:
+        # values[i, j] : i from left to right, j from bottom to top
+        finite = np.isfinite(values)
+        value_min = self.value_min if self.value_min is not None else \
+            (float(values[finite].min()) if finite.any() else 0)
+        value_max = self.value_max if self.value_max is not None else \
+            (float(values[finite].max()) if finite.any() else 1)
+        if value_max <= value_min:
+            value_max = value_min + 1
+
+        with np.errstate(invalid="ignore"):
+            scaled = np.clip((values - value_min) / (value_max - value_min), 0, 1)
+
+        positions = np.linspace(0, 1, len(self.colors))
+        surface = pygame.Surface(values.shape, pygame.SRCALPHA)
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        for channel in range(3):
+            pixels[:, :, channel] = np.interp(scaled, positions, self.colors[:, channel])[:, ::-1]
+        del pixels  # unlocks the surface
+
+        alphas = pygame.surfarray.pixels_alpha(surface)
+        alphas[:] = np.where(finite, self.alpha, 0)[:, ::-1]
+        del alphas
+
+        return surface
+
+    def __repr__(self):
+        return f"Heatmap(expression_name={self.expression_name})"
+
+
+def evaluate_grid(element, xs: np.ndarray, ys: np.ndarray, errors: ErrorCollector = None,
+                  is_cancelled=None) -> np.ndarray:
+    # values of expression(x, y) (nan where there is no value), in one call when the expression accepts numpy arrays,
+    # else point by point (is_cancelled() is checked before each point)
+    try:
+        with np.errstate(all="ignore"):
+            values = np.broadcast_to(np.asarray(element.expression(xs, ys)), xs.shape)
+
+        if values.dtype.kind in "biuf":
+            values = values.astype(float)
+            if errors is not None:
+                errors.add_many(element.expression_name, "ValueError", "Result Is NaN or Infinite",
+                                xs[~np.isfinite(values)])
+
+            return np.where(np.isfinite(values), values, np.nan)
+
+    except (ZeroDivisionError, ValueError, OverflowError, TypeError):
+        pass
+
+    values = np.empty(len(xs))
+    for index, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        if is_cancelled is not None and is_cancelled():
+            raise SamplingCancelled
+
+        try:
+            values[index] = float(element.expression(x, y))  # complex and None raise a TypeError
+
+        except (ZeroDivisionError, ValueError, OverflowError, TypeError) as e:
+            if errors is not None:
+                errors.add_exception(element.expression_name, e, x)
+
+            values[index] = math.nan
+
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+# marching squares : the edges of a cell are 0 (bottom), 1 (right), 2 (top) and 3 (left), the corners are numbered
+# 1 (bottom left), 2 (bottom right), 4 (top right) and 8 (top left), a cell's case is the sum of its positive corners,
+# a segment between two edges is drawn in the cells of the listed cases
+CONTOUR_SEGMENTS = {(3, 0): (1, 5, 14), (0, 1): (2, 10, 13), (3, 1): (3, 12),
+                    (1, 2): (4, 5, 11), (0, 2): (6, 9), (3, 2): (7, 8, 10)}
+
+
+def get_contour_segments(xs: np.ndarray, ys: np.ndarray, values: np.ndarray) -> tuple:
+    # the segments (x1, y1, x2, y2) of values = 0, values[i, j] being the value at (xs[i], ys[j])
+    v00, v10, v11, v01 = values[:-1, :-1], values[1:, :-1], values[1:, 1:], values[:-1, 1:]
+    cases = (v00 > 0) * 1 | (v10 > 0) * 2 | (v11 > 0) * 4 | (v01 > 0) * 8
+    cases[np.isnan(v00) | np.isnan(v10) | np.isnan(v11) | np.isnan(v01)] = 0
+
+    left, right = np.broadcast_to(xs[:-1, None], cases.shape), np.broadcast_to(xs[1:, None], cases.shape)
+    bottom, top = np.broadcast_to(ys[None, :-1], cases.shape), np.broadcast_to(ys[None, 1:], cases.shape)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # the points where the value is 0 on each edge (linear interpolation)
+        edges = [(left + v00 / (v00 - v10) * (right - left), bottom),
+                 (right, bottom + v10 / (v10 - v11) * (top - bottom)),
+                 (left + v01 / (v01 - v11) * (right - left), top),
+                 (left, bottom + v00 / (v00 - v01) * (top - bottom))]
+
+    x1, y1, x2, y2 = [], [], [], []
+    for (start, end), segment_cases in CONTOUR_SEGMENTS.items():
+        cells = np.isin(cases, segment_cases)
+        x1.append(edges[start][0][cells])
+        y1.append(edges[start][1][cells])
+        x2.append(edges[end][0][cells])
+        y2.append(edges[end][1][cells])
+
+    return np.concatenate(x1), np.concatenate(y1), np.concatenate(x2), np.concatenate(y2)
+
+
+def evaluate_images(element, xs: np.ndarray) -> tuple[np.ndarray, ErrorCollector]:
+    # run in the workers of the evaluation executor, the errors are sent back to be merged
+    errors = ErrorCollector()
+    images = element.get_images_at(xs, errors)
+
+    return images, errors
+
+
+class SampleCache:
+    # images of the functions on grids of multiples of a step (the level of detail), stored by tiles of TILE_SIZE
+    # samples and kept between two redraws : moving, zooming or going back to the initial view only calculates
+    # the samples that have never been calculated (or have been evicted, least recently used tiles first,
+    # when the memory budget is exceeded)
+    def __init__(self, memory_budget: int = 32 * 1024 * 1024):
+        if memory_budget < 0:
+            raise ValueError("memory_budget must be >= 0")
+
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+
+        self.tiles = OrderedDict()  # (function, step, tile index) -> (images (nan when no image), calculated mask)
+
+        # set by the CoordinateSystem when the evaluation is parallel, the fallback executor (threads) is used
+        # for the functions that can't be sent to the processes (lambdas, closures...)
+        self.executor = None
+        self.fallback_executor = None
+        self.workers = 1
+        self.picklable = {}
+
+        self.lock = threading.Lock()
+
+        self.profiler = None  # set by the CoordinateSystem, counts the evaluations
+
+    def get_executor(self, element: Function):
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            return self.executor
+
+        if element not in self.picklable:
+            try:
+                pickle.dumps(element)
+                self.picklable[element] = True
+
+            except (pickle.PicklingError, AttributeError, TypeError):
+                self.picklable[element] = False
+
+        return self.executor if self.picklable[element] else self.fallback_executor
+
+    def get_tile(self, key: tuple) -> tuple[np.ndarray, np.ndarray]:
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = (np.full(TILE_SIZE, np.nan), np.zeros(TILE_SIZE, dtype=bool))
+            self.memory_used += tile[0].nbytes + tile[1].nbytes
+        else:
+            self.tiles.move_to_end(key)
+
+        return tile
+
+    def evict(self) -> None:
+        while self.memory_used > self.memory_budget and self.tiles:
+            images, calculated = self.tiles.popitem(last=False)[1]
+            self.memory_used -= images.nbytes + calculated.nbytes
+
+    def merge_errors(self, errors: ErrorCollector, new_errors: ErrorCollector) -> None:
+        with self.lock:
+            errors.merge(new_errors)
+
+    def compute_images(self, element: Function, xs: np.ndarray, errors: ErrorCollector,
+                       is_cancelled=None) -> np.ndarray:
+        executor = self.get_executor(element)
+
+        if executor is None:
+            chunk_size = len(xs) if element.vectorized else EVALUATION_CHUNK_SIZE
+            results = (evaluate_images(element, xs[i:i + chunk_size]) for i in range(0, len(xs), chunk_size))
+
+        else:
+            # the vectorized functions are evaluated in one call, the others are split between the workers
+            chunks_number = 1 if element.vectorized else min(self.workers, math.ceil(len(xs) / EVALUATION_CHUNK_SIZE))
+            chunk_size = math.ceil(len(xs) / max(chunks_number, 1))
+            futures = [executor.submit(evaluate_images, element, xs[i:i + chunk_size])
+                       for i in range(0, len(xs), chunk_size)]
+
+            results = (future.result() for future in futures)
+
+        images = np.empty(len(xs))
+        offset = 0
+        for chunk_images, chunk_errors in results:
+            if is_cancelled is not None and is_cancelled():
+                if executor is not None:
+                    for future in futures:
+                        future.cancel()
+
+                raise SamplingCancelled
+
+            images[offset:offset + len(chunk_images)] = chunk_images
+            offset += len(chunk_images)
+            self.merge_errors(errors, chunk_errors)
+
+        if self.profiler is not None:
+            self.profiler.count(element, images)
+
+        return images
+
+    def get_images(self, element: Function, step: float, indices: np.ndarray, errors: ErrorCollector,
+                   is_cancelled=None) -> np.ndarray:
+        # images of element at indices * step (indices sorted), nan when there is no image
+        tile_indices = indices // TILE_SIZE
+        positions = indices % TILE_SIZE
+
+        groups = np.split(np.arange(len(indices)), np.flatnonzero(np.diff(tile_indices)) + 1)
+        with self.lock:
+            tiles = [self.get_tile((element, step, int(tile_indices[group[0]]))) for group in groups if len(group)]
+
+        missing = [group[~tile[1][positions[group]]] for group, tile in zip(groups, tiles)]
+        missing_images = self.compute_images(element, indices[np.concatenate(missing)] * step, errors,
+                                             is_cancelled) \
+            if any(len(group) for group in missing) else []
+
+        images = np.empty(len(indices))
+        offset = 0
+        for group, missing_group, (tile_images, calculated) in zip(groups, missing, tiles):
+            tile_images[positions[missing_group]] = missing_images[offset:offset + len(missing_group)]
+            calculated[positions[missing_group]] = True
+            offset += len(missing_group)
+
+            images[group] = tile_images[positions[group]]
+
+        with self.lock:
+            self.evict()
+
+        return images
+
+    def clear(self) -> None:
+        self.tiles = OrderedDict()
+        self.memory_used = 0
+
+
+class Profiler:
+    # times the stages of the frames of show and counts the evaluations and the failed evaluations (no image)
+    # of each element, callback(metrics) is called at the end of each frame
+    def __init__(self, callback=None, history: int = PROFILER_HISTORY):
+        if history <= 0:
+            raise ValueError("history must be > 0")
+
+        self.callback = callback
+
+        self.frames = deque(maxlen=history)  # {stage: duration (s)} of the last frames
+        self.stages = {}
+        self.last_mark = time.perf_counter()
+
+        self.evaluations = {}  # element -> number of evaluations
+        self.errors = {}  # element -> number of evaluations without image
+
+        self.lock = threading.Lock()
+
+    def start_frame(self) -> None:
+        self.stages = {}
+        self.last_mark = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        # the time since the previous mark is added to stage
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self) -> None:
+        self.frames.append(self.stages)
+
+        if self.callback is not None:
+            self.callback(self.get_metrics())
+
+    def count(self, element, images: np.ndarray) -> None:
+        with self.lock:
+            self.evaluations[element] = self.evaluations.get(element, 0) + len(images)
+            self.errors[element] = self.errors.get(element, 0) + int(np.count_nonzero(np.isnan(images)))
+
+    def get_metrics(self) -> dict:
+        average = {}
+        for stages in self.frames:
+            for stage, duration in stages.items():
+                average[stage] = average.get(stage, 0) + duration / len(self.frames)
+
+        frame_time = sum(average.values())
+
+        with self.lock:
+            evaluations, errors = dict(self.evaluations), dict(self.errors)
+
+        return {"frame": self.frames[-1] if self.frames else {}, "average": average, "frame_time": frame_time,
+                "fps": 1 / frame_time if frame_time > 0 else 0, "evaluations": evaluations, "errors": errors}
+
+    def get_hud_lines(self) -> list[str]:
+        metrics = self.get_metrics()
+
+        lines = [f"{metrics['fps']:.0f} fps ({metrics['frame_time'] * 1000:.1f} ms)"]
+        lines += [f"{stage} : {duration * 1000:.2f} ms" for stage, duration in metrics["average"].items()]
+        lines += [f"{element} : {evaluations} evaluations, {metrics['errors'].get(element, 0)} errors"
+                  for element, evaluations in metrics["evaluations"].items()]
+
+        return lines
+
+
+class SamplingCancelled(Exception):
+    pass
+
+
 class FunctionEvaluatingError(Exception):
     def __init__(self, error):
         self.message = f"Error while evaluating the function : \n {error}"
@@ -188,7 +925,8 @@ class FunctionEvaluatingError(Exception):
 
 class CoordinateSystem:
     def __init__(self, graph_elements: list, screen_size: tuple, x_min: float, x_max: float, x_graduation_step: float,
-                 y_min: float, y_max: float, y_graduation_step: float):
+                 y_min: float, y_max: float, y_graduation_step: float, cache_memory_budget: int = 32 * 1024 * 1024,
+                 parallel_evaluation: str = None, max_workers: int = None):
 
         self.width, self.height = screen_size
 
@@ -198,11 +936,17 @@ class CoordinateSystem:
         if y_min >= y_max:
             raise ValueError(f"y_min ({y_min}) must be less than y_max ({y_max})")
 
-        if x_graduation_step < 0:
-            raise ValueError("x_graduation_step must be >= 0 (0 for no graduation)")
+        if x_graduation_step != "auto" and x_graduation_step < 0:
+            raise ValueError("x_graduation_step must be >= 0 (0 for no graduation) or 'auto'")
+
+        if y_graduation_step != "auto" and y_graduation_step < 0:
+            raise ValueError("y_graduation_step must be >= 0 (0 for no graduation) or 'auto'")
 
-        if y_graduation_step < 0:
-            raise ValueError("y_graduation_step must be >= 0 (0 for no graduation)")
+        if parallel_evaluation not in (None, "thread", "process"):
+            raise ValueError(f"parallel_evaluation must be None, 'thread' or 'process' not {parallel_evaluation}")
+
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be > 0")
 
         if not isinstance(graph_elements, list):
             raise TypeError(f"graph_elements must be a list, not {type(graph_elements)}")
@@ -211,8 +955,9 @@ class CoordinateSystem:
             raise ValueError("screen dimensions must be non-negative")
 
         for element in graph_elements:
-            if not isinstance(element, (Function, Vector, Sequence)):
-                raise TypeError(f"element in graph_elements must be Function, Vector or Sequence, not {type(element)}")
+            if not isinstance(element, (Function, Vector, Sequence, ImplicitCurve, Heatmap)):
+                raise TypeError(f"element in graph_elements must be Function, Vector, Sequence, ImplicitCurve or "
+                                f"Heatmap, not {type(element)}")
 
         self.graph_elements = graph_elements
 
@@ -236,7 +981,24 @@ class CoordinateSystem:
         self.x_coordinate_yaxis = self.width * (-self.x_min) / self.len_x_axis
         self.y_coordinate_xaxis = self.height * (1 - (- self.y_min) / self.len_y_axis)
 
-        self.ignored_error = {}
+        self.ignored_error = ErrorCollector()
+
+        self.samples_cache = SampleCache(memory_budget=cache_memory_budget)
+
+        self.parallel_evaluation = parallel_evaluation
+        self.max_workers = max_workers
+        self.elements_executor = None
+
+        # background sampling : the worker calculates the points on a copy of the system (a snapshot of the view),
+        # each new request increments sampling_generation which cancels the copies of the previous requests
+        self.sampling_owner = None
+        self.sampling_generation = 0
+        self.sampling_request = None
+        self.sampling_running = False
+        self.sampling_completed = False
+        self.sampling_error = None
+        self.sampling_condition = threading.Condition()
+        self.sampling_thread = None
 
         self.getting_points = bool
 
@@ -258,6 +1020,29 @@ class CoordinateSystem:
 
         self.mouse_pos = tuple
 
+        self.point_sprites = {}  # color -> pre-rendered point
+
+        self.plot_layer = None
+        self.plot_layer_dirty = True
+
+        self.profiler = None
+        self.show_profiler = False
+
+        self.sampler = None  # generator of the progressive sampling (iterate_points)
+        self.sampling_deadline = math.inf  # end of the frame budget of the progressive sampling (perf_counter)
+        self.sample_costs = {}  # function -> measured seconds per sample, sizes the chunks of the progressive sampling
+        self.progressive_executor = None  # thread of the elements the progressive sampling calculates in one call
+
+        self.animation_grids = {}  # animated function -> (view, xs, x positions), reused while the view doesn't change
+
+        # Sequence -> ((n_min, stop, step), ns, terms) of the last calculation, a vertical pan only projects them again
+        self.sequence_terms = {}
+
+        # ImplicitCurve and Heatmap -> ((x spacing, y spacing), first i, first j, values) of the last calculated grid
+        self.grids = {}
+
+        self.heatmaps = {}  # Heatmap -> (surface, (left, top)) of the last calculated view, drawn by draw_heatmap
+
         print("system init")
 
     def set_axes_info(self) -> None:
@@ -306,31 +1091,114 @@ class CoordinateSystem:
 
         return x_coordinate, y_coordinate
 
+    def get_positions_from_coordinates(self, x_coordinates: np.ndarray,
+                                       y_coordinates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # get_position_from_coordinate for whole arrays, in one affine transformation
+        with np.errstate(over="ignore", invalid="ignore"):
+            x_positions = (x_coordinates - self.x_min) * (self.width / self.len_x_axis)
+            y_positions = self.height - (y_coordinates - self.y_min) * (self.height / self.len_y_axis)
+
+        return x_positions, y_positions
+
+    def cull_points(self, x_positions: np.ndarray, y_positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # a point is kept (valid) if it is on screen or if one of its segments may cross the screen (its ends are not
+        # both on the same side of the screen), the kept points far off-screen are moved closer for the rasterizer
+        with np.errstate(invalid="ignore"):
+            outcodes = ((x_positions < -CULLING_MARGIN) * 1 | (x_positions > self.width + CULLING_MARGIN) * 2 |
+                        (y_positions < -CULLING_MARGIN) * 4 | (y_positions > self.height + CULLING_MARGIN) * 8)
+
+        finite = np.isfinite(x_positions) & np.isfinite(y_positions)
+
+        visible_segments = finite[:-1] & finite[1:] & ((outcodes[:-1] & outcodes[1:]) == 0)
+        valid = finite & (outcodes == 0)
+        valid[:-1] |= visible_segments
+        valid[1:] |= visible_segments
+
+        limit = CLAMP_FACTOR * max(self.width, self.height)
+        with np.errstate(invalid="ignore"):
+            far = valid & ((np.abs(x_positions) > limit) | (np.abs(y_positions) > limit))
+
+        if far.any():
+            x_positions, y_positions, valid = self.clip_far_points(x_positions, y_positions, valid, far, limit)
+
+        # the points without neighbour (or with a neighbour without image) are just clamped
+        np.clip(x_positions, -limit, limit, out=x_positions)
+        np.clip(y_positions, -limit, limit, out=y_positions)
+
+        return x_positions, y_positions, valid
+
+    def clip_far_points(self, x_positions: np.ndarray, y_positions: np.ndarray, valid: np.ndarray, far: np.ndarray,
+                        limit: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # clamping x and y separately would change the direction of the segments crossing the screen : the far
+        # points are moved along their segment to the square of side 2 * limit, a far point linked to both of its
+        # neighbours is split in two points (the end of its segment from the previous point and the start of its
+        # segment to the next one)
+        finite = np.isfinite(x_positions) & np.isfinite(y_positions)
+        has_previous = far & np.concatenate(([False], finite[:-1]))
+        has_next = far & np.concatenate((finite[1:], [False]))
+
+        counts = 1 + (has_previous & has_next)
+        new_indices = np.cumsum(counts) - counts  # index of each point in the new arrays
+        indices = np.repeat(np.arange(len(x_positions)), counts)
+        new_x_positions, new_y_positions, new_valid = x_positions[indices], y_positions[indices], valid[indices]
+
+        for linked, offset, destinations in ((has_previous, -1, new_indices),
+                                             (has_next, 1, new_indices + counts - 1)):
+            points = np.flatnonzero(linked)
+            new_x_positions[destinations[points]], new_y_positions[destinations[points]] = \
+                self.clip_segments(x_positions[points + offset], y_positions[points + offset],
+                                   x_positions[points], y_positions[points], limit)
+
+        return new_x_positions, new_y_positions, new_valid
+
+    def clip_segments(self, x_starts: np.ndarray, y_starts: np.ndarray, x_ends: np.ndarray, y_ends: np.ndarray,
+                      limit: float) -> tuple[np.ndarray, np.ndarray]:
+        # the last point of each segment (start -> end) inside the square of side 2 * limit (Liang-Barsky)
+        x_deltas, y_deltas = x_ends - x_starts, y_ends - y_starts
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            x_exits = np.where(x_deltas > 0, (limit - x_starts) / x_deltas,
+                               np.where(x_deltas < 0, (-limit - x_starts) / x_deltas, np.inf))
+            y_exits = np.where(y_deltas > 0, (limit - y_starts) / y_deltas,
+                               np.where(y_deltas < 0, (-limit - y_starts) / y_deltas, np.inf))
+            exits = np.clip(np.minimum(x_exits, y_exits), 0, 1)
+
+            return x_starts + exits * x_deltas, y_starts + exits * y_deltas
+
+    def get_graduation_step(self, graduation_step, axis_length: float, pixels: float) -> float:
+        # "auto" : the smallest step of 1, 2 or 5 times a power of 10 leaving GRADUATION_SPACING pixels between
+        # two graduations, the number of graduations doesn't depend on the zoom
+        if graduation_step != "auto":
+            return graduation_step
+
+        minimum_step = axis_length * GRADUATION_SPACING / max(pixels, 1)
+        power = 10 ** math.floor(math.log10(minimum_step))
+        for factor in (1, 2, 5, 10):
+            if factor * power >= minimum_step:
+                return factor * power
+
+    def get_graduation_values(self, minimum: float, maximum: float, step: float) -> tuple[np.ndarray, list]:
+        # only the visible graduations, on the integer grid of the samples (no accumulated float error, the bounds
+        # are kept despite rounding), returns the values and their labels
+        values = get_grid_indices(minimum, maximum, step) * step
+
+        digits = max(2, 1 - math.floor(math.log10(step)))
+        labels = np.round(values, digits) if isinstance(step, float) else values
+
+        return values, labels.tolist()
+
     def get_x_graduations(self, show_x_graduation_coordinate: bool) -> list:
         if self.x_graduation_step == 0:
             return []
 
-        graduations = []
-
-        x_grad = 0
-        while x_grad <= self.x_max:
-            x, y = self.get_position_from_coordinate((x_grad, 0))
-            graduations.append((x, y))
+        step = self.get_graduation_step(self.x_graduation_step, self.len_x_axis, self.width)
+        x_grads, labels = self.get_graduation_values(self.x_min, self.x_max, step)
 
-            if show_x_graduation_coordinate:
-                self.graduation_coordinate.append([(x, y + 10), x_grad])
+        x_positions, y_positions = self.get_positions_from_coordinates(x_grads, np.zeros(len(x_grads)))
+        graduations = list(zip(x_positions.tolist(), y_positions.tolist()))
 
-            x_grad += self.x_graduation_step
-
-        x_grad = 0
-        while x_grad >= self.x_min:
-            x, y = self.get_position_from_coordinate((x_grad, 0))
-            graduations.append((x, y))
-
-            if show_x_graduation_coordinate:
-                self.graduation_coordinate.append([(x, y + 10), x_grad])
-
-            x_grad -= self.x_graduation_step
+        if show_x_graduation_coordinate:
+            self.graduation_coordinate += [[(x, y + 10), label] for (x, y), label in zip(graduations, labels)]
 
         return graduations
 
@@ -338,26 +1206,14 @@ class CoordinateSystem:
         if self.y_graduation_step == 0:
             return []
 
-        graduations = []
-        y_grad = 0
-        while y_grad <= self.y_max:
-            x, y = self.get_position_from_coordinate((0, y_grad))
-            graduations.append((x, y))
-
-            if show_y_graduation_coordinate:
-                self.graduation_coordinate.append([(x - 10, y), y_grad])
+        step = self.get_graduation_step(self.y_graduation_step, self.len_y_axis, self.height)
+        y_grads, labels = self.get_graduation_values(self.y_min, self.y_max, step)
 
-            y_grad += self.y_graduation_step
+        x_positions, y_positions = self.get_positions_from_coordinates(np.zeros(len(y_grads)), y_grads)
+        graduations = list(zip(x_positions.tolist(), y_positions.tolist()))
 
-        y_grad = 0
-        while y_grad >= self.y_min:
-            x, y = self.get_position_from_coordinate((0, y_grad))
-            graduations.append((x, y))
-
-            if show_y_graduation_coordinate:
-                self.graduation_coordinate.append([(x - 10, y), y_grad])
-
-            y_grad -= self.y_graduation_step
+        if show_y_graduation_coordinate:
+            self.graduation_coordinate += [[(x - 10, y), label] for (x, y), label in zip(graduations, labels)]
 
         return graduations
 
@@ -371,38 +1227,330 @@ class CoordinateSystem:
             pygame.draw.line(self.screen, graduation_color, (x - 5, y), (x + 5, y))
 
         if len(self.graduation_coordinate) > 0:
-            font = pygame.font.Font(None, 20)
             for i in self.graduation_coordinate:
                 coordinate = i[0]
                 text = i[1]
 
-                text_surface = font.render(str(round(text, 2)), True, graduation_color)
+                text_surface = get_label(str(text), graduation_color, 20)
                 text_rect = text_surface.get_rect(center=coordinate)
 
                 self.screen.blit(source=text_surface, dest=text_rect)
 
-    def get_curve_points(self, element) -> list:
+    def need_refinement(self, images_a: np.ndarray, images_b: np.ndarray, deviations: np.ndarray,
+                        tolerance: float) -> np.ndarray:
+        # True for the segments crossing the edge of the domain of definition or whose middle is expected further
+        # than tolerance pixels from the segment (deviations, nan when unknown)
+        invalid_a, invalid_b = np.isnan(images_a), np.isnan(images_b)
+
+        with np.errstate(invalid="ignore"):
+            bent = deviations > tolerance
+
+        return (invalid_a != invalid_b) | (~invalid_a & ~invalid_b & bent)
+
+    def get_base_deviations(self, images: np.ndarray) -> np.ndarray:
+        # expected deviation (pixels) of the middle of each segment of the base samples, from the curvature :
+        # a second difference d of the positions bends the neighbouring segments by about d / 8 in their middle
+        y_positions = self.get_clipped_y_positions(images)
+
+        bends = np.full(len(images), np.nan)
+        with np.errstate(invalid="ignore"):
+            bends[1:-1] = np.abs(y_positions[:-2] - 2 * y_positions[1:-1] + y_positions[2:]) / 8
+
+        return np.fmax(bends[:-1], bends[1:])
+
+    def get_clipped_y_positions(self, y_coordinates: np.ndarray) -> np.ndarray:
+        # off-screen values are clipped to one screen height above or below, their variations aren't visible
+        y_positions = self.height * (1 - (y_coordinates - self.y_min) / self.len_y_axis)
+
+        return np.clip(y_positions, -self.height, 2 * self.height)
+
+    def get_cached_images(self, element: Function) -> tuple[np.ndarray, np.ndarray]:
+        # the samples without image are kept (nan) so the lines of the curve are cut there
+        step = element.trace_step
+        indices = get_grid_indices(self.x_min, self.x_max, step, outer=True)
+
+        images = self.samples_cache.get_images(element, step, indices, self.ignored_error, self.is_sampling_cancelled)
+
+        return indices * step, images
+
+    def get_adaptive_images(self, element: Function) -> tuple[np.ndarray, np.ndarray]:
+        # about one sample per pixel column (on a power of 2 step so the samples are reused between zooms),
+        # then the segments are halved where the curvature bends them by more than adaptive_tolerance pixels : from
+        # the second differences of the base samples, then from the deviation of the calculated middles (a half of a
+        # segment is bent 4 times less than the segment)
+        tolerance = element.adaptive_tolerance
+        step = 2.0 ** math.floor(math.log2(self.len_x_axis / max(int(self.width), 1)))
+        indices = np.arange(math.floor(self.x_min / step), math.ceil(self.x_max / step) + 1)
+
+        images = self.samples_cache.get_images(element, step, indices, self.ignored_error, self.is_sampling_cancelled)
+        xs, ys = [indices * step], [images]
+
+        # a segment is the index of its start (it ends at the next index) and the images of its ends
+        to_refine = self.need_refinement(images[:-1], images[1:], self.get_base_deviations(images), tolerance)
+        segments, starts, ends = indices[:-1][to_refine], images[:-1][to_refine], images[1:][to_refine]
+
+        for _ in range(ADAPTIVE_MAX_DEPTH):
+            if not len(segments):
+                break
+
+            step /= 2
+            middle_indices = segments * 2 + 1
+            middles = self.samples_cache.get_images(element, step, middle_indices, self.ignored_error,
+                                                    self.is_sampling_cancelled)
+            xs.append(middle_indices * step)
+            ys.append(middles)
+
+            with np.errstate(invalid="ignore"):
+                deviations = np.abs(self.get_clipped_y_positions(middles) -
+                                    (self.get_clipped_y_positions(starts) + self.get_clipped_y_positions(ends)) / 2)
+
+            left = self.need_refinement(starts, middles, deviations / 4, tolerance)
+            right = self.need_refinement(middles, ends, deviations / 4, tolerance)
+
+            segments = np.concatenate((middle_indices[left] - 1, middle_indices[right]))
+            starts = np.concatenate((starts[left], middles[right]))
+            ends = np.concatenate((middles[left], ends[right]))
+
+        xs, ys = np.concatenate(xs), np.concatenate(ys)
+        order = np.argsort(xs, kind="stable")
+
+        return xs[order], ys[order]
+
+    def count_evaluations(self, element, images: np.ndarray) -> None:
+        # the evaluations of the cached functions are counted by the SampleCache
+        if self.profiler is not None:
+            self.profiler.count(element, images)
+
+    def get_curve_points(self, element) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # x positions, y positions and valid (False where there is no point)
+        if type(element) is Function and element.animated:
+            return self.get_animated_points(element)
+
+        if type(element) is ImplicitCurve:
+            return self.get_implicit_curve_points(element)
+
+        if type(element) is Heatmap:
+            # a heatmap is an image, not points : its surface is kept in heatmaps (unless the view is already
+            # outdated) and its curve has no point
+            heatmap = self.get_heatmap(element)
+            if self.is_sampling_cancelled():
+                raise SamplingCancelled
+
+            self.heatmaps[element] = heatmap
+
+            return np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+
+        return self.get_points_from_samples(element, *self.get_samples(element))
+
+    def get_animated_points(self, element: Function) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # the x grid and its positions only change with the view, each frame only calculates and projects the images
+        # (the images depend on the time, they are not cached)
+        view = (self.x_min, self.x_max, self.width, element.trace_step)
+        grid = self.animation_grids.get(element)
+        if grid is None or grid[0] != view:
+            xs = get_grid_indices(self.x_min, self.x_max, element.trace_step, outer=True) * element.trace_step
+            grid = self.animation_grids[element] = (view, xs, (xs - self.x_min) * (self.width / self.len_x_axis))
+
+        view, xs, x_positions = grid
+        errors = ErrorCollector()
         try:
-            if type(element) is Function:
-                points_coordinate = element.get_images(start=self.x_min, stop=self.x_max, step=element.trace_step,
-                                                       errors_dict=self.ignored_error)
+            ys = element.get_images_at(xs, errors)
+
+        except Exception as e:
+            raise FunctionEvaluatingError(e)
+
+        self.ignored_error.replace(element, errors)
+
+        self.count_evaluations(element, ys)
+
+        # cull_points clamps x_positions in place, the same way for each frame of the view
+        with np.errstate(over="ignore", invalid="ignore"):
+            y_positions = self.height - (ys - self.y_min) * (self.height / self.len_y_axis)
+
+        return self.get_points_from_positions(element, x_positions, y_positions)
+
+    def get_samples(self, element) -> tuple[np.ndarray, np.ndarray]:
+        try:
+            if type(element) is Function and element.adaptive:
+                xs, ys = self.get_adaptive_images(element)
+            elif type(element) is Function:
+                xs, ys = self.get_cached_images(element)
             elif type(element) is Sequence:
-                points_coordinate = element.get_terms(start=element.n_min, stop=self.x_max, step=element.trace_step,
-                                                      errors_dict=self.ignored_error)
+                xs, ys = self.get_sequence_terms(element)
             elif type(element) is Vector:
-                points_coordinate = element.get_points()
+                xs, ys = element.get_points()
+
+        except SamplingCancelled:
+            raise
 
         except Exception as e:
-            pygame.quit()
             raise FunctionEvaluatingError(e)
 
-        points = []
+        return xs, ys
+
+    def get_sequence_terms(self, element: Sequence) -> tuple[np.ndarray, np.ndarray]:
+        # the terms only depend on the n range, they are read again (all of them) when x_max changes
+        key = (element.n_min, self.x_max, element.trace_step)
+        previous = self.sequence_terms.get(element)
+        if previous is not None and previous[0] == key:
+            return previous[1], previous[2]
 
-        for x, y in points_coordinate.items():
-            points.append(self.get_position_from_coordinate((x, y)))
+        errors = ErrorCollector()
+        ns, terms = element.get_terms(start=element.n_min, stop=self.x_max, step=element.trace_step,
+                                      errors=errors, is_cancelled=self.is_sampling_cancelled)
+        self.ignored_error.replace(element, errors)
+        self.count_evaluations(element, terms)
+
+        self.sequence_terms[element] = (key, ns, terms)
+
+        return ns, terms
+
+    def get_grid_values(self, element) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # values at (i * x spacing, j * y spacing) for the visible i and j, the spacings are the powers of 2 closest
+        # to resolution pixels (below) so moving the view keeps the same grid : only the samples that were not in
+        # the previous grid of the element are calculated, in one call
+        x_spacing = 2.0 ** math.floor(math.log2(self.len_x_axis * element.resolution / max(int(self.width), 1)))
+        y_spacing = 2.0 ** math.floor(math.log2(self.len_y_axis * element.resolution / max(int(self.height), 1)))
+
+        i = np.arange(math.floor(self.x_min / x_spacing), math.ceil(self.x_max / x_spacing) + 1)
+        j = np.arange(math.floor(self.y_min / y_spacing), math.ceil(self.y_max / y_spacing) + 1)
+
+        values = np.full((len(i), len(j)), np.nan)
+        calculated = np.zeros(values.shape, dtype=bool)
+
+        previous = self.grids.get(element)
+        if previous is not None and previous[0] == (x_spacing, y_spacing):
+            spacings, previous_i, previous_j, previous_values = previous
+            i_start, i_end = max(i[0], previous_i), min(i[-1], previous_i + previous_values.shape[0] - 1) + 1
+            j_start, j_end = max(j[0], previous_j), min(j[-1], previous_j + previous_values.shape[1] - 1) + 1
+
+            if i_start < i_end and j_start < j_end:
+                overlap = (slice(i_start - i[0], i_end - i[0]), slice(j_start - j[0], j_end - j[0]))
+                values[overlap] = previous_values[i_start - previous_i:i_end - previous_i,
+                                                  j_start - previous_j:j_end - previous_j]
+                calculated[overlap] = True
+
+        missing = ~calculated
+        if missing.any():
+            xs = np.broadcast_to(i[:, None] * x_spacing, values.shape)[missing]
+            ys = np.broadcast_to(j[None, :] * y_spacing, values.shape)[missing]
+
+            try:
+                values[missing] = evaluate_grid(element, xs, ys, self.ignored_error, self.is_sampling_cancelled)
+
+            except SamplingCancelled:
+                raise
+
+            except Exception as e:
+                raise FunctionEvaluatingError(e)
+
+            self.count_evaluations(element, values[missing])
+
+        self.grids[element] = ((x_spacing, y_spacing), int(i[0]), int(j[0]), values)
+
+        return i * x_spacing, j * y_spacing, values
+
+    def get_implicit_curve_points(self, element: ImplicitCurve) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # the segments of the marching squares are runs of 2 points separated by a point without image
+        x1, y1, x2, y2 = get_contour_segments(*self.get_grid_values(element))
+        cuts = np.full(len(x1), np.nan)
+
+        xs = np.column_stack((x1, x2, cuts)).ravel()
+        ys = np.column_stack((y1, y2, cuts)).ravel()
+
+        return self.cull_points(*self.get_positions_from_coordinates(xs, ys))
+
+    def get_heatmap(self, element: Heatmap) -> tuple[pygame.Surface, tuple[float, float]]:
+        # the surface of the heatmap (one pixel per sample, stretched to the size of the cells) and its position
+        xs, ys, values = self.get_grid_values(element)
+        x_spacing = xs[1] - xs[0] if len(xs) > 1 else self.len_x_axis
+        y_spacing = ys[1] - ys[0] if len(ys) > 1 else self.len_y_axis
+
+        left, top = self.get_position_from_coordinate((xs[0] - x_spacing / 2, ys[-1] + y_spacing / 2))
+        width = len(xs) * x_spacing * self.width / self.len_x_axis
+        height = len(ys) * y_spacing * self.height / self.len_y_axis
+
+        surface = pygame.transform.scale(element.get_surface(values), (max(round(width), 1), max(round(height), 1)))
+
+        return surface, (left, top)
+
+    def get_points_from_samples(self, element, xs: np.ndarray,
+                                ys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.get_points_from_positions(element, *self.get_positions_from_coordinates(xs, ys))
+
+    def get_points_from_positions(self, element, x_positions: np.ndarray,
+                                  y_positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if type(element) is Function and element.draw_lines_between_points:
+            x_positions, y_positions = self.cut_jumps(x_positions, y_positions)
+
+        points = self.cull_points(x_positions, y_positions)
+
+        if type(element) is Function:
+            points = self.decimate_points(points, element)
 
         return points
 
+    def cut_jumps(self, x_positions: np.ndarray, y_positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # a segment from beyond one side of the screen to beyond the other one, going in the opposite direction
+        # of its neighbours and taller than them, crosses an asymptote (tan at pi / 2, 1 / x at 0...) : the curve
+        # diverges on both sides, a point without image is inserted there so the line is cut
+        if len(y_positions) < 3:
+            return x_positions, y_positions
+
+        with np.errstate(invalid="ignore", over="ignore"):
+            differences = np.diff(y_positions)
+            sizes, signs = np.abs(differences), np.sign(differences)
+
+            above, below = y_positions < 0, y_positions > self.height
+            jumps = (above[:-1] & below[1:]) | (below[:-1] & above[1:])
+            jumps[1:] &= (signs[1:] == -signs[:-1]) & (sizes[1:] > sizes[:-1])
+            jumps[:-1] &= (signs[:-1] == -signs[1:]) & (sizes[:-1] > sizes[1:])
+
+        cuts = np.flatnonzero(jumps) + 1
+        if not len(cuts):
+            return x_positions, y_positions
+
+        return np.insert(x_positions, cuts, np.nan), np.insert(y_positions, cuts, np.nan)
+
+    def decimate_points(self, points: tuple, element: Function) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # when there are more points than pixel columns, only the first, last, lowest and highest points of each
+        # column of each run are linked (the drawn line is the same) and only one point is drawn per pixel
+        x_positions, y_positions, valid = points
+        indices = np.flatnonzero(valid)
+
+        if len(indices) <= DECIMATION_THRESHOLD * self.width:
+            return points
+
+        keep = np.zeros(len(indices), dtype=bool)
+        columns = np.floor(x_positions[indices]).astype(np.int64)
+
+        if element.draw_lines_between_points:
+            run_starts = np.diff(indices) > 1
+            groups = np.flatnonzero((np.diff(columns) != 0) | run_starts) + 1
+            starts = np.concatenate(([0], groups))
+            ends = np.concatenate((groups, [len(indices)]))
+
+            group_ids = np.repeat(np.arange(len(starts)), ends - starts)
+            order = np.lexsort((y_positions[indices], group_ids))  # by group then by y
+
+            keep[starts] = keep[ends - 1] = True
+            keep[order[starts]] = keep[order[ends - 1]] = True
+
+        if element.draw_points:
+            # the first point of each (column, row) pair, the kept off-screen points have rows outside of the screen
+            rows = np.floor(y_positions[indices]).astype(np.int64)
+            order = np.lexsort((rows, columns))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = (np.diff(columns[order]) != 0) | (np.diff(rows[order]) != 0)
+            keep[order[first]] = True
+
+        # the first invalid point after a run is kept to cut the line there
+        kept = np.zeros(len(valid), dtype=bool)
+        kept[indices[keep]] = True
+        kept[1:] |= ~valid[1:] & valid[:-1]
+
+        return x_positions[kept], y_positions[kept], valid[kept]
+
     def draw_arrow(self, color, start_pos, end_pos, arrow_width=3, arrow_length=7) -> None:
 
         angle = math.atan2(end_pos[1] - start_pos[1], end_pos[0] - start_pos[0])
@@ -417,37 +1565,59 @@ class CoordinateSystem:
         pygame.draw.line(self.screen, color, start_pos, end_pos, arrow_width)
         pygame.draw.polygon(self.screen, color, [arrow_tip, left, right])
 
-    def draw_curve(self, points: list, points_color: tuple, element) -> None:
-        index_counter = 0
-        for point_position in points:
-            if type(element) is Vector and element.draw_arrow:
-                self.draw_arrow(color=points_color, start_pos=points[0], end_pos=points[1])
+    def split_points(self, points: tuple) -> np.ndarray:
+        # the points without image cut the curve in runs of points to link, returns the (start, end) of the runs
+        valid = points[2].astype(np.int8)
+
+        return np.flatnonzero(np.diff(valid, prepend=0, append=0)).reshape(-1, 2)
+
+    def get_point_sprite(self, color: tuple) -> pygame.Surface:
+        sprite = self.point_sprites.get(tuple(color))
+        if sprite is None:
+            sprite = pygame.Surface((5, 5), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (2, 2), 2)
+            self.point_sprites[tuple(color)] = sprite
+
+        return sprite
+
+    def draw_curve(self, points: tuple, points_color: tuple, element) -> None:
+        if type(element) is Heatmap:
+            self.draw_heatmap(element)
+            return
+
+        x_positions, y_positions, valid = points
+
+        if type(element) is Vector and element.draw_arrow and len(x_positions) == 2 and valid.all():
+            self.draw_arrow(color=points_color, start_pos=(x_positions[0], y_positions[0]),
+                            end_pos=(x_positions[1], y_positions[1]))
+
+        if element.draw_lines_between_points:
+            for start, end in self.split_points(points):
+                if end - start > 1:
+                    pygame.draw.lines(self.screen, points_color, False,
+                                      np.column_stack((x_positions[start:end], y_positions[start:end])), 3)
 
-            if element.draw_points:
-                x, y = point_position
-                pygame.draw.circle(self.screen, points_color, (x, y), 2)
+        if element.draw_points:
+            sprite = self.get_point_sprite(points_color)
+            destinations = np.column_stack((x_positions[valid] - 2, y_positions[valid] - 2))
+            self.screen.blits(zip(itertools.repeat(sprite), destinations), doreturn=False)
 
-            if element.draw_lines_between_points and index_counter < len(points) - 1:
-                pygame.draw.line(self.screen, points_color, point_position, points[index_counter + 1], 3)
-                index_counter += 1
+    def draw_heatmap(self, element: Heatmap) -> None:
+        heatmap = self.heatmaps.get(element)
+        if heatmap is not None:  # None until the heatmap is calculated
+            self.screen.blit(*heatmap)
 
     def get_text_mouse_coordinate(self) -> tuple[pygame.Surface, pygame.Rect]:
         mouse_coordinate = self.get_coordinate_from_position(self.mouse_pos)
         mouse_coordinate = round(mouse_coordinate[0], 1), round(mouse_coordinate[1], 1)
 
-        font = pygame.font.Font(None, 20)
-        text_surface = font.render(str(mouse_coordinate), True, (0, 0, 0))
+        text_surface = get_label(str(mouse_coordinate), (0, 0, 0), 20)
         text_rect = text_surface.get_rect(center=(self.width - 40, 10))
 
         return text_surface, text_rect
 
     def show_ignored_errors(self):
-        list_error = ""
-        for error in self.ignored_error.items():
-            list_error += f"- element {error[0]} : \n"
-
-            for i in error[1]:
-                list_error += f"  - {i}\n"
+        list_error = self.ignored_error.get_report()
 
         messagebox_root = Tk()
         messagebox_root.withdraw()
@@ -457,45 +1627,333 @@ class CoordinateSystem:
 
         messagebox_root.destroy()
 
-    def get_graduation_and_points(self, show_x_graduation_coordinate: bool, show_y_graduation_coordinate: bool):
+    def get_graduations(self, show_x_graduation_coordinate: bool, show_y_graduation_coordinate: bool):
         self.graduation_coordinate = []
 
         self.x_grad = self.get_x_graduations(show_x_graduation_coordinate)
 
         self.y_grad = self.get_y_graduations(show_y_graduation_coordinate)
 
-        self.curves_points = []
-        for element in self.graph_elements:
+    def get_points(self, publish=None):
+        # publish(view, curves_points) is called after each element so the curves are updated progressively,
+        # the elements not calculated yet keep their previous points
+        if publish is not None and isinstance(self.curves_points, list) \
+                and len(self.curves_points) == len(self.graph_elements):
+            curves_points = [list(curve) for curve in self.curves_points]
+        else:
+            curves_points = [[element, (np.empty(0), np.empty(0), np.empty(0, dtype=bool))]
+                             for element in self.graph_elements]
+
+        # the background worker leaves the animated functions to the main loop (update_animation)
+        indices = [index for index, element in enumerate(self.graph_elements)
+                   if publish is None or not (type(element) is Function and element.animated)]
+
+        if self.parallel_evaluation is None:
+            results = ((index, self.get_curve_points(element=self.graph_elements[index])) for index in indices)
+
+        else:
+            self.start_executors()
+            # each element is calculated in its own thread, results are kept in the order of graph_elements
+            futures = [(index, self.elements_executor.submit(self.get_curve_points, self.graph_elements[index]))
+                       for index in indices]
+            results = ((index, future.result()) for index, future in futures)
+
+        for index, points in results:
+            if self.is_sampling_cancelled():
+                raise SamplingCancelled
+
+            curves_points[index] = [self.graph_elements[index], points]
+
+            if publish is not None:
+                publish(self, list(curves_points))
+
+        self.curves_points = curves_points
+
+    def get_coarse_multiple(self, element: Function) -> int:
+        # first pass of the progressive sampling : one sample of the trace_step grid every 2 ** k samples,
+        # about one every PROGRESSIVE_COARSE_SPACING pixels
+        step_pixels = element.trace_step * self.width / self.len_x_axis
+        if step_pixels >= PROGRESSIVE_COARSE_SPACING:
+            return 1
+
+        return 2 ** math.ceil(math.log2(PROGRESSIVE_COARSE_SPACING / step_pixels))
+
+    def get_chunk_size(self, element: Function, remaining_samples: int) -> int:
+        # as many samples as the measured cost per sample of the function allows before the sampling_deadline
+        cost = self.sample_costs.get(element)
+        if cost is None:
+            return min(PROGRESSIVE_FIRST_CHUNK_SIZE, remaining_samples)
+
+        samples = (self.sampling_deadline - time.perf_counter()) / max(cost, 1e-9)
+
+        return int(min(max(samples, PROGRESSIVE_MIN_CHUNK_SIZE), remaining_samples))
+
+    def iterate_grid_images(self, element: Function, multiple: int):
+        # the samples of the trace_step grid whose index is a multiple of multiple, yields between the chunks,
+        # the finer passes find the samples of the previous passes in the cache
+        step = element.trace_step
+        indices = get_grid_indices(self.x_min, self.x_max, step * multiple, outer=True) * multiple
+
+        images = np.empty(len(indices))
+        start = 0
+        while start < len(indices):
+            chunk = indices[start:start + self.get_chunk_size(element, len(indices) - start)]
+
+            chunk_start = time.perf_counter()
+            images[start:start + len(chunk)] = self.samples_cache.get_images(element, step, chunk, self.ignored_error)
+            self.sample_costs[element] = (time.perf_counter() - chunk_start) / len(chunk)
+
+            start += len(chunk)
+            yield
+
+        return indices * step, images
+
+    def iterate_points(self):
+        # progressive sampling : the functions are first calculated with a sample every PROGRESSIVE_COARSE_SPACING
+        # pixels then each pass doubles the number of samples until the trace_step ; yields after each chunk of
+        # samples so the caller can stop when its frame budget is spent, the curves are updated after each pass.
+        # The other elements (sequences, adaptive functions, grids) are calculated in one call : a thread calculates
+        # them on a copy of the view, like the background sampling, and a new sampler cancels them
+        self.sampling_generation += 1
+        if isinstance(self.curves_points, list) and len(self.curves_points) == len(self.graph_elements):
+            self.curves_points = [list(curve) for curve in self.curves_points]
+        else:
+            self.curves_points = [[element, (np.empty(0), np.empty(0), np.empty(0, dtype=bool))]
+                                  for element in self.graph_elements]
+
+        if self.parallel_evaluation is not None:
+            self.start_executors()
+
+        multiples = {index: self.get_coarse_multiple(element) for index, element in enumerate(self.graph_elements)
+                     if type(element) is Function and not element.adaptive and not element.animated}
+
+        others = {}
+        if not all(index in multiples or (type(element) is Function and element.animated)
+                   for index, element in enumerate(self.graph_elements)):
+            if self.progressive_executor is None:
+                self.progressive_executor = ThreadPoolExecutor(max_workers=1)
+
+            view = copy.copy(self)
+            view.sampling_owner = self
+
+            # the animated functions are calculated by the main loop (update_animation)
+            others = {index: self.progressive_executor.submit(view.get_curve_points, element)
+                      for index, element in enumerate(self.graph_elements)
+                      if index not in multiples and not (type(element) is Function and element.animated)}
+
+        while multiples or others:
+            for index, multiple in list(multiples.items()):
+                element = self.graph_elements[index]
+                try:
+                    xs, ys = yield from self.iterate_grid_images(element, multiple)
+
+                except Exception as e:
+                    raise FunctionEvaluatingError(e)
+
+                self.curves_points[index] = [element, self.get_points_from_samples(element, xs, ys)]
+                self.plot_layer_dirty = True
+
+                if multiple == 1:
+                    del multiples[index]
+                else:
+                    multiples[index] = multiple // 2
+
+                yield
+
+            if not others:
+                continue
+
+            if not multiples:
+                # nothing else to calculate : waits for the thread until the end of the frame budget
+                wait(others.values(), timeout=max(self.sampling_deadline - time.perf_counter(), 0),
+                     return_when=FIRST_COMPLETED)
+
+            for index, future in list(others.items()):
+                if not future.done():
+                    continue
+
+                try:
+                    points = future.result()
+
+                except FunctionEvaluatingError:
+                    raise
+
+                except Exception as e:
+                    raise FunctionEvaluatingError(e)
+
+                element = self.graph_elements[index]
+                self.curves_points[index] = [element, points]
+                self.plot_layer_dirty = True
+                del others[index]
+
+            yield
+
+    def sample_progressively(self, frame_budget: float) -> None:
+        # runs the progressive sampling for frame_budget seconds
+        self.sampling_deadline = time.perf_counter() + frame_budget
+        try:
+            while time.perf_counter() < self.sampling_deadline:
+                next(self.sampler)
+
+        except StopIteration:
+            self.sampler = None
+            self.sampling_completed = True
+
+    def is_animated(self) -> bool:
+        return any(type(element) is Function and element.animated for element in self.graph_elements)
+
+    def update_animation(self, t: float) -> None:
+        # only the animated functions are calculated again, the other elements may still be calculated
+        # (background or progressive sampling)
+        if not isinstance(self.curves_points, list) or len(self.curves_points) != len(self.graph_elements):
+            self.curves_points = [[element, (np.empty(0), np.empty(0), np.empty(0, dtype=bool))]
+                                  for element in self.graph_elements]
+
+        for index, element in enumerate(self.graph_elements):
+            if type(element) is Function and element.animated:
+                element.time = t
+                self.curves_points[index] = [element, self.get_curve_points(element)]
+
+        self.plot_layer_dirty = True
+
+    def get_graduation_and_points(self, show_x_graduation_coordinate: bool, show_y_graduation_coordinate: bool):
+        self.get_graduations(show_x_graduation_coordinate, show_y_graduation_coordinate)
+        self.get_points()
+
+    def is_sampling_cancelled(self) -> bool:
+        return self.sampling_owner is not None and self.sampling_owner.sampling_generation != self.sampling_generation
+
+    def request_points(self) -> None:
+        # ask the background worker for the points of the current view, cancels the previous request
+        self.sampling_generation += 1
+
+        view = copy.copy(self)
+        view.sampling_owner = self
+
+        with self.sampling_condition:
+            self.sampling_request = view
+            self.sampling_condition.notify()
+
+    def publish_points(self, view, curves_points: list) -> None:
+        if view.sampling_generation == self.sampling_generation:
+            # the animated functions keep the points of the main loop
+            if isinstance(self.curves_points, list) and len(self.curves_points) == len(curves_points):
+                curves_points = [self.curves_points[index] if type(curve[0]) is Function and curve[0].animated
+                                 else curve for index, curve in enumerate(curves_points)]
+
+            self.curves_points = curves_points
+            self.plot_layer_dirty = True
+
+            pygame.event.post(pygame.event.Event(POINTS_PUBLISHED_EVENT))
+
+    def sampling_worker(self) -> None:
+        while True:
+            with self.sampling_condition:
+                while self.sampling_request is None and self.sampling_running:
+                    self.sampling_condition.wait()
+
+                if not self.sampling_running:
+                    return
 
-            self.curves_points.append([element, self.get_curve_points(element=element)])
+                view, self.sampling_request = self.sampling_request, None
 
+            try:
+                view.get_points(publish=self.publish_points)
+
+            except SamplingCancelled:
+                continue
+
+            except FunctionEvaluatingError as error:
+                self.sampling_error = error
+                return
+
+            if view.sampling_generation == self.sampling_generation:
+                self.sampling_completed = True
+
+    def start_sampling(self) -> None:
+        self.sampling_running = True
+        self.sampling_error = None
+        self.sampling_thread = threading.Thread(target=self.sampling_worker, daemon=True)
+        self.sampling_thread.start()
+
+    def stop_sampling(self) -> None:
+        if self.sampling_thread is None:
+            return
+
+        with self.sampling_condition:
+            self.sampling_running = False
+            self.sampling_generation += 1  # cancels the request being calculated
+            self.sampling_condition.notify()
+
+        # the worker stops at its next check of the cancellation, but one evaluation (a term of a sequence,
+        # a vectorized call) can't be interrupted : the window doesn't wait for it (the thread is a daemon)
+        self.sampling_thread.join(SAMPLING_STOP_TIMEOUT)
+        self.sampling_thread = None
+
+    def start_executors(self) -> None:
+        if self.elements_executor is not None:
+            return
+
+        workers = self.max_workers or os.cpu_count() or 1
+
+        self.elements_executor = ThreadPoolExecutor(max_workers=max(len(self.graph_elements), 1))
+        self.samples_cache.workers = workers
+        self.samples_cache.fallback_executor = ThreadPoolExecutor(max_workers=workers)
+
+        if self.parallel_evaluation == "process":
+            self.samples_cache.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.samples_cache.executor = self.samples_cache.fallback_executor
+
+    def shutdown_executors(self) -> None:
+        if self.progressive_executor is not None:
+            self.sampling_generation += 1  # cancels the elements being calculated by the progressive sampling
+            self.progressive_executor.shutdown(wait=False, cancel_futures=True)
+            self.progressive_executor = None
+
+        if self.elements_executor is None:
+            return
+
+        for executor in {self.elements_executor, self.samples_cache.executor, self.samples_cache.fallback_executor}:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.elements_executor = None
+        self.samples_cache.executor = None
+        self.samples_cache.fallback_executor = None
 
     def move(self, x_velocity: float, y_velocity: float):
 
         key = pygame.key.get_pressed()
-        if pygame.time.get_ticks() % 10 == 0:
-            if key[pygame.K_RIGHT]:
-                self.x_max += x_velocity
-                self.x_min += x_velocity
-                self.getting_points = True
-
-            if key[pygame.K_LEFT]:
-                self.x_min -= x_velocity
-                self.x_max -= x_velocity
-                self.getting_points = True
-
-            if key[pygame.K_UP]:
-                self.y_min += y_velocity
-                self.y_max += y_velocity
-                self.getting_points = True
-
-            if key[pygame.K_DOWN]:
-                self.y_min -= y_velocity
-                self.y_max -= y_velocity
-                self.getting_points = True
-
-            if key[pygame.K_r]:
-                self.initial_xy()
+        if key[pygame.K_RIGHT]:
+            self.x_max += x_velocity
+            self.x_min += x_velocity
+            self.getting_points = True
+
+        if key[pygame.K_LEFT]:
+            self.x_min -= x_velocity
+            self.x_max -= x_velocity
+            self.getting_points = True
+
+        if key[pygame.K_UP]:
+            self.y_min += y_velocity
+            self.y_max += y_velocity
+            self.getting_points = True
+
+        if key[pygame.K_DOWN]:
+            self.y_min -= y_velocity
+            self.y_max -= y_velocity
+            self.getting_points = True
+
+        if key[pygame.K_r]:
+            self.initial_xy()
+
+    def is_idle(self) -> bool:
+        # nothing will change until the next event : no movement key held, nothing to redraw or to calculate
+        key = pygame.key.get_pressed()
+        moving = any(key[k] for k in (pygame.K_RIGHT, pygame.K_LEFT, pygame.K_UP, pygame.K_DOWN, pygame.K_r))
+
+        return not (moving or self.getting_points or self.plot_layer_dirty or self.sampling_completed or
+                    self.sampler is not None or self.is_animated())
 
     def zoom(self, x_min, x_max, y_min, y_max):
         self.x_min, self.x_max = x_min, x_max
@@ -530,13 +1988,22 @@ class CoordinateSystem:
              axes_color: tuple = (0, 0, 0),
              graduation_color: tuple = (0, 0, 0), show_x_axis: bool = True, show_x_graduation_coordinate: bool = False,
              show_y_axis: bool = True, show_y_graduation_coordinate: bool = False, show_coordinate: bool = False, win_title: str = "",
-             show_ignored_error: bool = False, x_step_movement: float = 0.5, y_step_movement: float = 0.5):
+             show_ignored_error: bool = False, x_step_movement: float = 0.5, y_step_movement: float = 0.5,
+             background_sampling: bool = True, fps: int = 60, profiler: Profiler = None, show_profiler: bool = False,
+             progressive: bool = False, frame_budget: float = 0.01):
+
+        if fps < 0:
+            raise ValueError("fps must be >= 0 (0 for no limit)")
+
+        if frame_budget <= 0:
+            raise ValueError("frame_budget must be > 0")
+
+        if progressive:
+            # the points are calculated by the main loop, a bit in each frame
+            background_sampling = False
 
         if points_color_list is None:
-            points_color_list = [(0, 0, 0), (0, 0, 255), (255, 0, 0),
-                                 (0, 255, 0), (255, 192, 203), (255, 165, 0),
-                                 (139, 69, 19), (0, 255, 255)
-                                 ]
+            points_color_list = DEFAULT_POINTS_COLORS
 
         pygame.init()
 
@@ -546,18 +2013,50 @@ class CoordinateSystem:
         pygame.display.set_caption(win_title)
         running = True
 
+        clock = pygame.time.Clock()
+
         self.zoom_mode = False
         self.first_point = True
         self.getting_points = True
 
+        self.curves_points = []
+        if background_sampling:
+            self.start_sampling()
+
+        self.set_profiler(profiler)
+        self.show_profiler = show_profiler
+
+        # the animated functions are calculated again in each frame, at the time since the opening of the window
+        animated = self.is_animated()
+        animation_start = time.perf_counter()
+
         while running:
-            for event in pygame.event.get():
+            # profiler is None when the profiling is disabled, nothing is measured
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.start_frame()
+
+            events = pygame.event.get()
+            if not events and self.is_idle():
+                # the sampling worker posts POINTS_PUBLISHED_EVENT to wake the loop up
+                events = [pygame.event.wait(IDLE_WAIT_TIMEOUT)] + pygame.event.get()
+
+                if profiler is not None:
+                    profiler.mark("wait")
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
 
                 if event.type == pygame.KEYUP and event.key == pygame.K_s:
                     self.screenshot()
 
+                if event.type == pygame.KEYUP and event.key == pygame.K_p:
+                    if self.profiler is None:
+                        self.set_profiler(Profiler())
+
+                    self.show_profiler = not self.show_profiler
+
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 3: # right click
                     self.zoom_mode = not self.zoom_mode
                     self.first_point = True
@@ -575,40 +2074,331 @@ class CoordinateSystem:
                             self.zoom(x_min, x_max, y_min, y_max)
                             self.first_point = True
 
-            self.screen.fill(background_color)
+                if event.type == pygame.VIDEORESIZE:
+                    self.width, self.height = event.w, event.h
+                    self.getting_points = True
+
             self.mouse_pos = pygame.mouse.get_pos()
 
-            if self.zoom_mode:
-                self.draw_zoom_rect()
+            if profiler is not None:
+                profiler.mark("events")
 
             if self.getting_points:
                 self.set_axes_info()
 
-                self.get_graduation_and_points(show_x_graduation_coordinate, show_y_graduation_coordinate)
+                self.get_graduations(show_x_graduation_coordinate, show_y_graduation_coordinate)
 
-                if show_ignored_error and any(len(values) > 0 for values in self.ignored_error.values()):
-                    self.show_ignored_errors()
+                if progressive:
+                    self.sampler = self.iterate_points()
+                elif background_sampling:
+                    self.request_points()
+                else:
+                    try:
+                        self.get_points()
+
+                    except FunctionEvaluatingError:
+                        self.shutdown_executors()
+                        quit_pygame()
+                        raise
+
+                    self.sampling_completed = True
 
                 self.getting_points = False
+                self.plot_layer_dirty = True
+
+                if profiler is not None:
+                    profiler.mark("get_graduation_and_points")
+
+            if self.sampler is not None:
+                try:
+                    self.sample_progressively(frame_budget)
+
+                except FunctionEvaluatingError:
+                    self.sampler = None
+                    self.shutdown_executors()
+                    quit_pygame()
+                    raise
+
+                if profiler is not None:
+                    profiler.mark("get_graduation_and_points")
+
+            if animated:
+                try:
+                    self.update_animation(time.perf_counter() - animation_start)
+
+                except FunctionEvaluatingError:
+                    self.stop_sampling()
+                    self.shutdown_executors()
+                    quit_pygame()
+                    raise
+
+                if profiler is not None:
+                    profiler.mark("get_graduation_and_points")
+
+            if self.sampling_error is not None:
+                self.stop_sampling()
+                self.shutdown_executors()
+                quit_pygame()
+                raise self.sampling_error
+
+            if self.sampling_completed:
+                self.sampling_completed = False
+
+                if show_ignored_error and len(self.ignored_error) > 0:
+                    self.show_ignored_errors()
+
+            frame_duration = min(clock.tick(fps) / 1000, MAX_FRAME_DURATION)
+
+            if profiler is not None:
+                profiler.mark("wait")
+
+            self.move(x_step_movement * MOVEMENTS_PER_SECOND * frame_duration,
+                      y_step_movement * MOVEMENTS_PER_SECOND * frame_duration)
+
+            if profiler is not None:
+                profiler.mark("move")
+
+            if self.plot_layer_dirty:
+                self.draw_plot_layer(background_color, points_color_list, axes_color, graduation_color,
+                                     show_x_axis, show_y_axis)
+
+            self.screen.blit(self.plot_layer, (0, 0))
+
+            if self.zoom_mode:
+                self.draw_zoom_rect()
 
             if show_coordinate:
                 text = self.get_text_mouse_coordinate()
                 self.screen.blit(text[0], text[1])
 
-            self.move(x_step_movement, y_step_movement)
-
-            self.draw_axes(axes_color, show_x_axis, show_y_axis)
-            self.draw_graduations(self.x_grad, self.y_grad, graduation_color)
+            if profiler is not None:
+                profiler.mark("blit")
 
-            for color_index, (element, points) in enumerate(self.curves_points):
-                self.draw_curve(points=points, points_color=points_color_list[color_index], element=element)
+                if self.show_profiler:
+                    self.draw_profiler_hud()
+                    profiler.mark("hud")
 
             pygame.display.update()
 
-        pygame.quit()
+            if profiler is not None:
+                profiler.mark("display.update")
+                profiler.end_frame()
+
+        self.sampler = None
+        self.stop_sampling()
+        self.shutdown_executors()
+        quit_pygame()
+
+    def draw_plot_layer(self, background_color: tuple, points_color_list: list, axes_color: tuple,
+                        graduation_color: tuple, show_x_axis: bool, show_y_axis: bool) -> None:
+        # axes, graduations and curves are drawn on an offscreen surface which is only redrawn when the view
+        # or the points change, the frames just blit it
+        self.plot_layer_dirty = False
+
+        if self.plot_layer is None or self.plot_layer.get_size() != (int(self.width), int(self.height)):
+            self.plot_layer = pygame.Surface((self.width, self.height))
+
+        display, self.screen = self.screen, self.plot_layer
+        profiler = self.profiler
+
+        self.screen.fill(background_color)
+        self.draw_axes(axes_color, show_x_axis, show_y_axis)
+
+        if profiler is not None:
+            profiler.mark("draw_axes")
+
+        self.draw_graduations(self.x_grad, self.y_grad, graduation_color)
+
+        if profiler is not None:
+            profiler.mark("draw_graduations")
+
+        for color_index, (element, points) in enumerate(self.curves_points):
+            self.draw_curve(points=points, points_color=points_color_list[color_index], element=element)
+
+        if profiler is not None:
+            profiler.mark("draw_curve")
+
+        self.screen = display
+
+    def set_profiler(self, profiler: Profiler) -> None:
+        self.profiler = profiler
+        self.samples_cache.profiler = profiler
+
+    def draw_profiler_hud(self) -> None:
+        font = get_font(18)
+
+        y = 5
+        for line in self.profiler.get_hud_lines():
+            text_surface = font.render(line, True, (0, 0, 0), (255, 255, 255))
+            self.screen.blit(text_surface, (5, y))
+            y += text_surface.get_height()
 
     def screenshot(self, filename: str = "screenshot.png") -> None:
         pygame.image.save(self.screen, filename)
 
+    def render(self, filename: str, background_color: tuple = (255, 255, 255), points_color_list: list = None,
+               axes_color: tuple = (0, 0, 0), graduation_color: tuple = (0, 0, 0), show_x_axis: bool = True,
+               show_x_graduation_coordinate: bool = False, show_y_axis: bool = True,
+               show_y_graduation_coordinate: bool = False) -> dict:
+        # draw the plot on an offscreen surface and save it without opening a window, returns the durations (s)
+        if points_color_list is None:
+            points_color_list = DEFAULT_POINTS_COLORS
+
+        pygame.font.init()
+
+        start = time.perf_counter()
+
+        self.set_axes_info()
+        self.get_graduations(show_x_graduation_coordinate, show_y_graduation_coordinate)
+        self.get_points()
+
+        sampling_end = time.perf_counter()
+
+        self.plot_layer = get_render_surface((self.width, self.height))
+        self.draw_plot_layer(background_color, points_color_list, axes_color, graduation_color,
+                             show_x_axis, show_y_axis)
+
+        drawing_end = time.perf_counter()
+
+        pygame.image.save(self.plot_layer, filename)
+
+        end = time.perf_counter()
+
+        return {"filename": filename, "sampling": sampling_end - start, "drawing": drawing_end - sampling_end,
+                "saving": end - drawing_end, "total": end - start}
+
+    def render_animation(self, filename: str, frames: int, fps: int = 30, background_color: tuple = (255, 255, 255),
+                         points_color_list: list = None, axes_color: tuple = (0, 0, 0),
+                         graduation_color: tuple = (0, 0, 0), show_x_axis: bool = True,
+                         show_x_graduation_coordinate: bool = False, show_y_axis: bool = True,
+                         show_y_graduation_coordinate: bool = False) -> dict:
+        # draw the frames of the animation (t = frame / fps) without opening a window, saved as a gif (needs Pillow)
+        # or as images named filename.format(frame) ("frame_{:04d}.png"), returns the durations (s)
+        if frames <= 0:
+            raise ValueError("frames must be > 0")
+
+        if fps <= 0:
+            raise ValueError("fps must be > 0")
+
+        gif = filename.lower().endswith(".gif")
+        if gif:
+            try:
+                from PIL import Image
+
+            except ImportError:
+                raise ImportError("Pillow is needed to save a gif (pip install pillow), "
+                                  "or save the frames as images (filename like 'frame_{:04d}.png')")
+
+        elif "{" not in filename:
+            raise ValueError("filename must end with .gif or contain {} for the number of the frame")
+
+        if points_color_list is None:
+            points_color_list = DEFAULT_POINTS_COLORS
+
+        pygame.font.init()
+
+        start = time.perf_counter()
+
+        for element in self.graph_elements:
+            if type(element) is Function and element.animated:
+                element.time = 0.0
+
+        self.set_axes_info()
+        self.get_graduations(show_x_graduation_coordinate, show_y_graduation_coordinate)
+        self.get_points()
+
+        self.plot_layer = get_render_surface((self.width, self.height))
+
+        images = []
+        for frame in range(frames):
+            if frame > 0:
+                self.update_animation(frame / fps)
+
+            self.draw_plot_layer(background_color, points_color_list, axes_color, graduation_color,
+                                 show_x_axis, show_y_axis)
+
+            if gif:
+                images.append(Image.frombytes("RGB", self.plot_layer.get_size(),
+                                              pygame.image.tobytes(self.plot_layer, "RGB")))
+            else:
+                pygame.image.save(self.plot_layer, filename.format(frame))
+
+        if gif:
+            images[0].save(filename, save_all=True, append_images=images[1:], duration=round(1000 / fps), loop=0)
+
+        end = time.perf_counter()
+
+        return {"filename": filename, "frames": frames, "total": end - start, "per_frame": (end - start) / frames}
+
+    def __copy__(self):
+        # shallow copy (the views of the sampling worker share the cache and the ignored errors)
+        view = CoordinateSystem.__new__(CoordinateSystem)
+        view.__dict__.update(self.__dict__)
+
+        return view
+
+    def __getstate__(self) -> dict:
+        # surfaces, threads and executors can't be sent to another process, they are recreated by __setstate__
+        state = self.__dict__.copy()
+        for name in ("screen", "plot_layer", "point_sprites", "samples_cache", "elements_executor",
+                     "sampling_owner", "sampling_request", "sampling_condition", "sampling_thread", "profiler",
+                     "sampler", "progressive_executor", "heatmaps"):
+            del state[name]
+
+        state["cache_memory_budget"] = self.samples_cache.memory_budget
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        cache_memory_budget = state.pop("cache_memory_budget")
+        self.__dict__.update(state)
+
+        self.screen = pygame.Surface((self.width, self.height))
+        self.plot_layer = None
+        self.point_sprites = {}
+        self.samples_cache = SampleCache(memory_budget=cache_memory_budget)
+        self.elements_executor = None
+
+        self.sampling_owner = None
+        self.sampling_request = None
+        self.sampling_condition = threading.Condition()
+        self.sampling_thread = None
+
+        self.profiler = None
+        self.sampler = None
+        self.progressive_executor = None
+        self.heatmaps = {}
+
     def __repr__(self) -> str:
         return f"CoordinateSystem(graph_elements: {self.graph_elements}, x_min={self.x_min}, x_max={self.x_max}, y_min={self.y_min}, y_max={self.y_max})"
+
+
+def render_job(job: tuple) -> dict:
+    system, filename, *options = job
+    try:
+        return system.render(filename, **(options[0] if options else {}))
+
+    finally:
+        system.shutdown_executors()
+
+
+def render_many(jobs: list, processes: int = None) -> list[dict]:
+    # jobs : (system, filename) or (system, filename, options of render), rendered in a process pool,
+    # the jobs that can't be sent to another process (lambdas...) are rendered in this process
+    if processes == 1:
+        return [render_job(job) for job in jobs]
+
+    picklable = []
+    for job in jobs:
+        try:
+            pickle.dumps(job)
+            picklable.append(True)
+
+        except (pickle.PicklingError, AttributeError, TypeError):
+            picklable.append(False)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(render_job, job) if job_picklable else None
+                   for job, job_picklable in zip(jobs, picklable)]
+
+        return [render_job(job) if future is None else future.result() for job, future in zip(jobs, futures)]
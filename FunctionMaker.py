@@ -1,24 +1,109 @@
 from tkinter import *
 from tkinter import messagebox, colorchooser
 from CoordinateSystem import CoordinateSystem, FunctionEvaluatingError, Function
+import numpy as np
+import builtins
 import math
+import ast
+
+
+# math attribute -> numpy equivalent (used to build the vectorized form of the expression)
+MATH_TO_NUMPY = {"sqrt": "sqrt", "exp": "exp", "expm1": "expm1", "log": "log", "log10": "log10", "log2": "log2",
+                 "log1p": "log1p", "sin": "sin", "cos": "cos", "tan": "tan", "asin": "arcsin", "acos": "arccos",
+                 "atan": "arctan", "atan2": "arctan2", "sinh": "sinh", "cosh": "cosh", "tanh": "tanh",
+                 "asinh": "arcsinh", "acosh": "arccosh", "atanh": "arctanh", "fabs": "fabs", "floor": "floor",
+                 "ceil": "ceil", "trunc": "trunc", "pow": "power", "hypot": "hypot", "degrees": "degrees",
+                 "radians": "radians", "pi": "pi", "e": "e", "tau": "tau", "inf": "inf", "nan": "nan"}
+
+
+class NumpyTransformer(ast.NodeTransformer):
+    def __init__(self):
+        self.vectorizable = True
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id == "math" and node.attr in MATH_TO_NUMPY:
+            return ast.copy_location(ast.Attribute(value=ast.Name(id="np", ctx=ast.Load()),
+                                                   attr=MATH_TO_NUMPY[node.attr], ctx=node.ctx), node)
+
+        self.vectorizable = False
+        return node
+
+    def visit_Name(self, node):
+        if node.id not in ("x", "abs"):
+            self.vectorizable = False
+
+        return node
+
+    def visit_Call(self, node):
+        is_log_with_base = isinstance(node.func, ast.Attribute) and node.func.attr == "log" and len(node.args) > 1
+        if is_log_with_base or node.keywords:
+            self.vectorizable = False
+
+        return self.generic_visit(node)
+
+    def generic_visit(self, node):
+        # comparisons and conditions can't be applied to a whole array
+        if isinstance(node, (ast.Compare, ast.IfExp, ast.BoolOp)):
+            self.vectorizable = False
+
+        return super().generic_visit(node)
+
+
+def make_lambda(body: ast.expr, global_vars: dict):
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg="x")], kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=arguments, body=body)))
+
+    f = eval(compile(tree, "<f(x)>", "eval"), global_vars)
+    f.__name__ = "f"
+    return f
+
+
+def compile_expression(expression: str) -> tuple:
+    # parse and check the expression once, return (function, vectorized)
+    tree = ast.parse(expression.strip(), mode="eval")
+
+    # the names bound in the expression itself (comprehension targets, lambda arguments, :=) aren't free names
+    bound_names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)}
+    bound_names |= {node.arg for node in ast.walk(tree) if isinstance(node, ast.arg)}
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in ("x", "math") and node.id not in bound_names \
+                and not hasattr(builtins, node.id):
+            raise NameError(f"name '{node.id}' is not defined")
+
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "math" \
+                and not hasattr(math, node.attr):
+            raise AttributeError(f"module 'math' has no attribute '{node.attr}'")
+
+    transformer = NumpyTransformer()
+    numpy_body = transformer.visit(ast.parse(expression.strip(), mode="eval").body)
+
+    if transformer.vectorizable:
+        return make_lambda(numpy_body, {"np": np}), True
+
+    return make_lambda(tree.body, {"math": math}), False
 
 
 def show_function():
-    def f(x: float) -> float:
-        return eval(function_entry.get(), {"x": x, "math": math})
+    try:
+        f, vectorized = compile_expression(function_entry.get())
+
+    except (SyntaxError, NameError, AttributeError) as error:
+        messagebox.showerror(title="function error", message=f"Invalid function : \n {error}")
+        return
 
     try:
         system = CoordinateSystem(graph_elements=[Function(expression=f, trace_step=float(trace_step_entry.get()),
+                                  vectorized=vectorized,
                                   draw_points=draw_points_param[1].get(),
                                   draw_lines_between_points=draw_lines_between_points_param[1].get())],
                                   screen_size=(float(win_width_entry.get()), float(win_height_entry.get())),
                                   x_min=float(x_min_entry.get()),
                                   x_max=float(x_max_entry.get()),
-                                  x_graduation_step=float(x_graduation_step_entry.get()),
+                                  x_graduation_step=get_graduation_step(x_graduation_step_entry.get()),
                                   y_min=float(y_min_entry.get()),
                                   y_max=float(y_max_entry.get()),
-                                  y_graduation_step=float(y_graduation_step_entry.get())
+                                  y_graduation_step=get_graduation_step(y_graduation_step_entry.get())
                                   )
 
         if more_option:
@@ -42,6 +127,12 @@ def show_function():
         return
 
 
+def get_graduation_step(value: str):
+    value = value.strip()
+
+    return value if value == "auto" else float(value)
+
+
 def make_param_entry(win: Tk, param_name: str, row, description: str, default_value: str) -> Entry:
     Label(win, text=param_name).grid(row=row, column=0)
     Label(win, text=description).grid(row=row, column=2)
@@ -135,12 +226,12 @@ win_height_entry = make_param_entry(root, "window_height", 1, "float > 0", "500"
 function_entry = make_param_entry(root, "f(x) =", 2, "python syntax (math library can be used)", "")
 x_min_entry = make_param_entry(root, "x_min", 3, "float", "-10")
 x_max_entry = make_param_entry(root, "x_max", 4, "float", "10")
-x_graduation_step_entry = make_param_entry(root, "x_graduation_step", 5, "float > 0 | 0 for no graduation", "1")
+x_graduation_step_entry = make_param_entry(root, "x_graduation_step", 5, "float > 0 | 0 for no graduation | auto", "1")
 
 
 y_min_entry = make_param_entry(root, "y_min", 6, "float", "-10")
 y_max_entry = make_param_entry(root, "y_max", 7, "float", "10")
-y_graduation_step_entry = make_param_entry(root, "y_graduation_step", 8, "float > 0 | 0 for no graduation", "1")
+y_graduation_step_entry = make_param_entry(root, "y_graduation_step", 8, "float > 0 | 0 for no graduation | auto", "1")
 
 trace_step_entry = make_param_entry(root, "trace_step", 9, "", "0.1")
 automatic_tracestep_label = Label(root, text="")